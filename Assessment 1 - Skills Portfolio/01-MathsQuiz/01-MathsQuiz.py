@@ -5,6 +5,18 @@ from tkinter import *
 from tkinter import ttk, messagebox, simpledialog, filedialog
 import time
 import platform
+import threading
+import bisect
+import hashlib
+import heapq
+import queue
+import atexit
+import struct
+import zlib
+import asyncio
+import socket
+from collections import OrderedDict, deque
+from datetime import date, timedelta
 
 #--- Configuration ---
 DIFFICULTY = {
@@ -15,13 +27,68 @@ DIFFICULTY = {
 }
 QUESTIONS_PER_QUIZ = 10
 LEADERBOARD_FILE = "leaderboard.json"
-PROFILES_FILE = "profiles.json"
+LEADERBOARD_LOG = "leaderboard.log.jsonl"
+LEADERBOARD_COMPACT_EVERY = 200
+LEADERBOARD_PAGE = 50
+PROFILES_FILE = "profiles.json"  # legacy single-file store, migrated on first run
+PROFILES_DIR = "profiles"
+PROFILE_CACHE_SIZE = 32
+PROFILE_PICK_LIMIT = 50      # matches offered in the profile dropdown
+HISTORY_RAW_LIMIT = 200      # raw attempts kept per profile
+HISTORY_DAILY_DAYS = 366     # daily rollups kept before folding into weeks
+ATTEMPT_LOG = "attempts.bin"
+LATENCY_BUCKETS_MS = (500, 1000, 2000, 3000, 5000, 8000, 13000, 20000, 30000)
+LATENCY_EWMA_ALPHA = 0.2
+STATS_FILE = "stats.json"
+STATS_DAYS = 90              # days of active-player sets kept
+STATS_BINS = 11              # score buckets: 0-9%, 10-19%, ..., 100%
+CHART_POINTS = 300           # progress chart points after downsampling
+CHART_CACHE_SIZE = 64
+# "rule" names an entry in ACHIEVEMENT_RULES; "params" are passed to it
 ACHIEVEMENTS_DEF = [
-    {"id": "speed_demon", "title": "Speed Demon", "desc": "Answer 10 questions under 30 seconds total"},
-    {"id": "brain_master", "title": "Brain Master", "desc": "Score >= 90%"},
-    {"id": "perfect_run", "title": "Perfect Run", "desc": "No wrong answers in a quiz"},
-    {"id": "comeback", "title": "Comeback", "desc": "Get >=50% after initially falling below 30%"}
+    {"id": "speed_demon", "title": "Speed Demon", "desc": "Answer 10 questions under 30 seconds total",
+     "rule": "total_time", "params": {"max_seconds": 30}},
+    {"id": "brain_master", "title": "Brain Master", "desc": "Score >= 90%",
+     "rule": "percent", "params": {"min_percent": 90}},
+    {"id": "perfect_run", "title": "Perfect Run", "desc": "No wrong answers in a quiz",
+     "rule": "no_wrong"},
+    {"id": "comeback", "title": "Comeback", "desc": "Get >=50% after initially falling below 30%",
+     "rule": "comeback", "params": {"window": 3, "below": 30, "reach": 50}},
+    {"id": "hot_streak", "title": "Hot Streak", "desc": "Answer 5 questions in a row correctly first time",
+     "rule": "streak", "params": {"length": 5}},
+    {"id": "extreme_ace", "title": "Extreme Ace", "desc": "Score >= 80% on Extreme",
+     "rule": "percent", "params": {"min_percent": 80, "difficulty": "Extreme"}},
 ]
+ACHIEVEMENTS_BY_ID = {a["id"]: a for a in ACHIEVEMENTS_DEF}
+
+THEMES = {
+    "dark": {
+        "PRIMARY_BG": "#0b1220",
+        "MAIN_BG": "#071025",
+        "SIDEBAR_BG": "#0f1724",
+        "CARD_BG": "#1e293b",  # Updated to be slightly lighter for contrast
+        "TEXT_LIGHT": "#e6eef8",
+        "ACCENT": "#2b8ef6",
+        "ACCENT_HOVER": "#60a5fa",
+        "ENTRY_BG": "#071829",
+        "MUTED": "#93a4b8",
+        "SUCCESS": "#22c55e",  # Added for Feedback
+        "ERROR": "#ef4444",
+    },
+    "light": {
+        "PRIMARY_BG": "#e2e8f0",
+        "MAIN_BG": "#f3f4f6",
+        "SIDEBAR_BG": "#e5e7eb",
+        "CARD_BG": "#ffffff",
+        "TEXT_LIGHT": "#0f172a",  # key kept from the dark theme: it is the main text colour
+        "ACCENT": "#2b8ef6",
+        "ACCENT_HOVER": "#1d6fd1",
+        "ENTRY_BG": "#f8fafc",
+        "MUTED": "#475569",
+        "SUCCESS": "#22c55e",
+        "ERROR": "#ef4444",
+    },
+}
 
 # --- 1. SMART FONT SELECTION (Added for better visuals) ---
 SYS_OS = platform.system()
@@ -48,16 +115,1073 @@ def load_json_file(path, default):
     except Exception:
         return default
 
-def save_json_file(path, data):
-    try:
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
-    except Exception as e:
+def atomic_write_text(path, text):
+    # write to a temp file next to the target, then rename over it
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def atomic_write_json(path, data):
+    atomic_write_text(path, json.dumps(data, separators=(',', ':')))
+
+#--- Background persistence ---
+# Saves are queued per path and written by one worker thread, so the Tk loop
+# never waits on the disk. Data is encoded at submit time (callers keep
+# mutating their dicts); if a path is saved again before the worker reaches it,
+# only the newest version is written. Submitting None deletes the file.
+# Failures land in `errors` for the UI to pick up.
+class PersistenceWorker:
+    def __init__(self):
+        self._pending = {}
+        self._order = deque()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._thread = None
+        self.errors = queue.Queue()
+
+    def submit(self, path, data):
+        text = None if data is None else json.dumps(data, separators=(',', ':'))
+        with self._cond:
+            if path not in self._pending:
+                self._order.append(path)
+            self._pending[path] = text
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._order:
+                    self._cond.wait()
+                path = self._order.popleft()
+                text = self._pending.pop(path)
+                self._busy = True
+            try:
+                if text is None:
+                    if os.path.exists(path):
+                        os.remove(path)
+                else:
+                    atomic_write_text(path, text)
+            except Exception as e:
+                self.report(path, e)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        # block until everything queued so far is on disk; False on timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._order or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def report(self, path, e):
         print(f"Failed saving {path}: {e}")
+        self.errors.put(f"{path}: {e}")
+
+persistence = PersistenceWorker()
+atexit.register(persistence.flush, 5)
+
+#--- Ranked leaderboard index ---
+# A bucketed sorted list: each bucket holds at most 2*LOAD entries, so an insert
+# is a bisect over the bucket maxima plus a bisect/insert inside one small bucket
+# instead of re-sorting the whole history after every quiz.
+class RankedIndex:
+    LOAD = 512
+
+    def __init__(self):
+        self._buckets = []
+        self._maxes = []
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for b in self._buckets:
+            yield from b
+
+    def clear(self):
+        self._buckets, self._maxes, self._len = [], [], 0
+
+    @classmethod
+    def from_sorted(cls, entries):
+        # bulk build from already-sorted entries: slicing, no per-entry bisect
+        idx = cls()
+        idx._buckets = [entries[i:i + cls.LOAD] for i in range(0, len(entries), cls.LOAD)]
+        idx._maxes = [b[-1] for b in idx._buckets]
+        idx._len = len(entries)
+        return idx
+
+    def _locate(self, entry):
+        i = bisect.bisect_left(self._maxes, entry)
+        return min(i, len(self._buckets) - 1)
+
+    def insert(self, entry):
+        # returns the 0-based position the entry landed at
+        self._len += 1
+        if not self._buckets:
+            self._buckets.append([entry])
+            self._maxes.append(entry)
+            return 0
+        i = self._locate(entry)
+        b = self._buckets[i]
+        pos = bisect.bisect_right(b, entry)
+        b.insert(pos, entry)
+        self._maxes[i] = b[-1]
+        rank = sum(len(x) for x in self._buckets[:i]) + pos
+        if len(b) > 2 * self.LOAD:
+            self._buckets[i:i + 1] = [b[:self.LOAD], b[self.LOAD:]]
+            self._maxes[i:i + 1] = [b[self.LOAD - 1], b[-1]]
+        return rank
+
+    def count_before(self, entry):
+        # number of entries that sort strictly before `entry`
+        if not self._buckets:
+            return 0
+        i = bisect.bisect_left(self._maxes, entry)
+        if i == len(self._buckets):
+            return self._len
+        return sum(len(x) for x in self._buckets[:i]) + bisect.bisect_left(self._buckets[i], entry)
+
+    # Keys passed to the iterators are entry prefixes without the record, e.g.
+    # a page cursor; since every key ends in a unique seq, a prefix sorts just
+    # before its own entry.
+    def iter_after(self, key=None):
+        # ascending, strictly after the entry whose key is `key`
+        if not self._buckets:
+            return
+        i, pos = 0, 0
+        if key is not None:
+            i = bisect.bisect_left(self._maxes, key)
+            if i == len(self._buckets):
+                return
+            b = self._buckets[i]
+            pos = bisect.bisect_left(b, key)
+            if pos < len(b) and b[pos][:len(key)] == key:
+                pos += 1
+        for j in range(i, len(self._buckets)):
+            yield from self._buckets[j][pos if j == i else 0:]
+
+    def iter_before(self, key=None):
+        # descending, strictly before `key`
+        if not self._buckets:
+            return
+        i = len(self._buckets) - 1
+        pos = len(self._buckets[i])
+        if key is not None:
+            i = min(bisect.bisect_left(self._maxes, key), i)
+            b = self._buckets[i]
+            pos = bisect.bisect_left(b, key)
+        for j in range(i, -1, -1):
+            b = self._buckets[j]
+            yield from reversed(b[:pos] if j == i else b)
+
+class RankedLeaderboard:
+    # Keys are (-score, time, seq): higher score first, earlier time breaks ties,
+    # and seq keeps equal results in arrival order without comparing dicts.
+    def __init__(self):
+        self.overall = RankedIndex()
+        self.by_difficulty = {d: RankedIndex() for d in DIFFICULTY}
+        self.by_name = {}
+        # chronological twins, keyed (time, seq)
+        self.by_time = RankedIndex()
+        self.by_name_time = {}
+        self._seq = 0
+
+    @staticmethod
+    def _key(rec):
+        return (-rec.get('score', 0), rec.get('time', ''))
+
+    def __len__(self):
+        return len(self.overall)
+
+    @classmethod
+    def from_records(cls, records):
+        # one sort per ordering instead of an insert per record and index
+        lb = cls()
+        entries, times = [], []
+        for rec in records:
+            lb._seq += 1
+            entries.append(cls._key(rec) + (lb._seq, rec))
+            times.append((rec.get('time', ''), lb._seq, rec))
+        entries.sort()
+        times.sort()
+        groups = {d: [] for d in DIFFICULTY}
+        by_name, by_name_time = {}, {}
+        for e in entries:
+            rec = e[-1]
+            groups.setdefault(rec.get('difficulty'), []).append(e)
+            name = rec.get('name')
+            by_name.setdefault(name, []).append(e)
+        for t in times:
+            by_name_time.setdefault(t[-1].get('name'), []).append(t)
+        lb.overall = RankedIndex.from_sorted(entries)
+        lb.by_difficulty = {d: RankedIndex.from_sorted(g) for d, g in groups.items()}
+        lb.by_name = {n: RankedIndex.from_sorted(g) for n, g in by_name.items()}
+        lb.by_time = RankedIndex.from_sorted(times)
+        lb.by_name_time = {n: RankedIndex.from_sorted(g) for n, g in by_name_time.items()}
+        return lb
+
+    def clear(self):
+        self.overall.clear()
+        for idx in self.by_difficulty.values():
+            idx.clear()
+        self.by_name.clear()
+        self.by_time.clear()
+        self.by_name_time.clear()
+
+    def add(self, rec):
+        # returns the 1-based overall rank of the new result
+        self._seq += 1
+        entry = self._key(rec) + (self._seq, rec)
+        rank = self.overall.insert(entry) + 1
+        diff = rec.get('difficulty')
+        if diff not in self.by_difficulty:
+            self.by_difficulty[diff] = RankedIndex()
+        self.by_difficulty[diff].insert(entry)
+        name = rec.get('name')
+        if name not in self.by_name:
+            self.by_name[name] = RankedIndex()
+            self.by_name_time[name] = RankedIndex()
+        self.by_name[name].insert(entry)
+        when = (rec.get('time', ''), self._seq, rec)
+        self.by_time.insert(when)
+        self.by_name_time[name].insert(when)
+        return rank
+
+    def rank(self, rec, difficulty=None):
+        # 1-based rank a result with this score/time holds (ties share the best rank)
+        idx = self.overall if difficulty is None else self.by_difficulty.get(difficulty)
+        if idx is None:
+            return None
+        return idx.count_before(self._key(rec)) + 1
+
+    def names(self):
+        return sorted(self.by_name, key=str)
+
+    def query(self, difficulty=None, name=None, since=None, until=None, order='rank', cursor=None, limit=LEADERBOARD_PAGE):
+        # One page of results plus a cursor for the next (None on the last page).
+        # `since`/`until` are 'YYYY-MM-DD[ HH:MM:SS]' prefixes, both inclusive.
+        # The most selective index (name, then difficulty) drives the scan.
+        if order == 'rank':
+            idx = self.by_name.get(name) if name is not None else \
+                self.by_difficulty.get(difficulty) if difficulty is not None else self.overall
+            entries = idx.iter_after(cursor) if idx else ()
+        else:  # 'newest'
+            idx = self.by_name_time.get(name) if name is not None else self.by_time
+            start = cursor
+            if start is None and until is not None:
+                start = (until + '\uffff',)
+            entries = idx.iter_before(start) if idx else ()
+        rows, last = [], None
+        for e in entries:
+            rec = e[-1]
+            t = rec.get('time', '')
+            if since is not None and t < since:
+                if order != 'rank':
+                    break  # descending time: nothing older can match
+                continue
+            if until is not None and t[:len(until)] > until:
+                continue
+            if difficulty is not None and rec.get('difficulty') != difficulty:
+                continue
+            if name is not None and rec.get('name') != name:
+                continue
+            if len(rows) == limit:
+                return {'rows': rows, 'cursor': last}
+            rows.append(rec)
+            last = e[:-1]
+        return {'rows': rows, 'cursor': None}
+
+#--- Append-only leaderboard log ---
+# Every finished quiz is one fsynced JSON line in LEADERBOARD_LOG. Once the log
+# holds LEADERBOARD_COMPACT_EVERY results, a background thread folds it into the
+# LEADERBOARD_FILE snapshot. Each log segment starts with an {"epoch": n} header;
+# a snapshot with epoch S already contains every segment whose epoch is < S.
+# Compaction renames the live segment to .prev, starts segment n+1 and writes
+# snapshot n+1; a .prev that a crash left unabsorbed is folded into a snapshot
+# before the next rename, so no step of it can lose or duplicate results.
+class LeaderboardLog:
+    def __init__(self, snapshot_path, log_path, compact_every=LEADERBOARD_COMPACT_EVERY):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.prev_path = log_path + '.prev'
+        self.compact_every = compact_every
+        self.records = []
+        self.index = RankedLeaderboard()
+        self.epoch = 0           # epoch of the live segment
+        self.tail_count = 0      # results not yet in the snapshot
+        self.log_count = 0       # results in the live segment
+        self._snap_epoch = 0
+        self._fh = None
+        self._lock = threading.Lock()
+        self._snap_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.loaded = threading.Event()
+        self._compacting = False
+
+    def _read_segment(self, path, min_epoch):
+        out = []
+        if not os.path.exists(path):
+            return out
+        with open(path, 'r', encoding='utf-8') as f:
+            for i, line in enumerate(f):
+                try:
+                    obj = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a crash
+                if i == 0 and isinstance(obj, dict) and set(obj) == {'epoch'}:
+                    if obj['epoch'] < min_epoch:
+                        return []
+                    continue
+                out.append(obj)
+        return out
+
+    @staticmethod
+    def _segment_epoch(path):
+        # the epoch in a segment's header, None if missing or header-less
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                obj = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+        return obj['epoch'] if isinstance(obj, dict) and set(obj) == {'epoch'} else None
+
+    def load(self):
+        # builds fresh records/index and swaps them in, so readers on other
+        # threads never see a half-built index
+        snap = load_json_file(self.snapshot_path, [])
+        if isinstance(snap, list):  # pre-log leaderboard.json
+            snap = {'epoch': 0, 'records': snap}
+        snap_epoch = snap.get('epoch', 0)
+        prev = self._read_segment(self.prev_path, snap_epoch)
+        live = self._read_segment(self.log_path, snap_epoch)
+        # appends continue in the live segment's epoch; one the snapshot already
+        # holds is dropped, and without one the next segment follows .prev
+        log_epoch, prev_epoch = self._segment_epoch(self.log_path), self._segment_epoch(self.prev_path)
+        if log_epoch is not None and log_epoch < snap_epoch:
+            os.remove(self.log_path)
+            log_epoch = None
+        if log_epoch is None:
+            log_epoch = max(snap_epoch, prev_epoch + 1 if prev_epoch is not None else 0)
+        records = snap.get('records', []) + prev + live
+        index = RankedLeaderboard.from_records(records)
+        with self._lock:
+            self.epoch, self._snap_epoch = log_epoch, snap_epoch
+            self.records, self.index = records, index
+            self.tail_count = len(prev) + len(live)
+            self.log_count = len(live)
+        self.loaded.set()
+        if self.tail_count >= self.compact_every:
+            self.compact_async()
+        return self.records
+
+    def ensure_loaded(self):
+        # loads on the calling thread, or waits for a load already under way
+        if self.loaded.is_set():
+            return
+        with self._load_lock:
+            if not self.loaded.is_set():
+                self.load()
+
+    def load_async(self):
+        threading.Thread(target=self.ensure_loaded, daemon=True).start()
+
+    def _open_log(self):
+        if self._fh is None:
+            # cut a line torn by a crash, or the next result would be glued to it
+            try:
+                with open(self.log_path, 'rb+') as f:
+                    data = f.read()
+                    if data and not data.endswith(b'\n'):
+                        f.truncate(data.rfind(b'\n') + 1)
+            except FileNotFoundError:
+                pass
+            new = not os.path.exists(self.log_path) or os.path.getsize(self.log_path) == 0
+            self._fh = open(self.log_path, 'a', encoding='utf-8')
+            if new:
+                self._fh.write(json.dumps({'epoch': self.epoch}) + '\n')
+        return self._fh
+
+    def append(self, rec):
+        # returns the 1-based overall rank of the new result
+        self.ensure_loaded()
+        with self._lock:
+            self.records.append(rec)
+            rank = self.index.add(rec)
+            try:
+                fh = self._open_log()
+                fh.write(json.dumps(rec, separators=(',', ':')) + '\n')
+                fh.flush()
+                os.fsync(fh.fileno())
+            except Exception as e:
+                persistence.report(self.log_path, e)
+            self.tail_count += 1
+            self.log_count += 1
+        if self.tail_count >= self.compact_every:
+            self.compact_async()
+        return rank
+
+    def _prev_pending(self):
+        # a .prev from an interrupted compaction that no snapshot holds yet
+        if not os.path.exists(self.prev_path):
+            return False
+        epoch = self._segment_epoch(self.prev_path)
+        return epoch is None or epoch >= self._snap_epoch
+
+    def _rotate(self):
+        # caller holds the lock; start a fresh segment for the next epoch.
+        # Returns False if an unabsorbed .prev could not be saved first.
+        if self._prev_pending():
+            absorbed = self.records[:len(self.records) - self.log_count]
+            if not self._write_snapshot(self.epoch, absorbed):
+                return False
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if os.path.exists(self.log_path):
+            os.replace(self.log_path, self.prev_path)
+        self.epoch += 1
+        self.tail_count = self.log_count = 0
+        self._open_log().flush()
+        return True
+
+    def compact(self):
+        self.ensure_loaded()
+        with self._lock:
+            if not self._rotate():
+                return
+            epoch, records = self.epoch, list(self.records)
+        self._write_snapshot(epoch, records)
+
+    def _write_snapshot(self, epoch, records):
+        with self._snap_lock:
+            if epoch < self._snap_epoch:
+                return True  # a newer snapshot (e.g. from clear) already landed
+            try:
+                atomic_write_json(self.snapshot_path, {'epoch': epoch, 'records': records})
+                self._snap_epoch = epoch
+                if os.path.exists(self.prev_path):
+                    os.remove(self.prev_path)
+                return True
+            except Exception as e:
+                persistence.report(self.snapshot_path, e)
+                return False
+
+    def compact_async(self):
+        if self._compacting:
+            return
+        self._compacting = True
+        def run():
+            try:
+                self.compact()
+            finally:
+                self._compacting = False
+        threading.Thread(target=run, daemon=True).start()
+
+    def clear(self):
+        self.ensure_loaded()
+        with self._lock:
+            rotated = self._rotate()
+            self.records.clear()
+            self.index.clear()
+            epoch = self.epoch
+        if rotated:
+            self._write_snapshot(epoch, [])
+
+#--- Profile name index ---
+# Names kept as (casefolded, name) pairs in one sorted list, so every name with a
+# given prefix is a contiguous run found with two bisects; a page of matches is
+# a slice of that run. Adding or removing a name is a single insort/delete.
+class NameIndex:
+    def __init__(self, names=()):
+        self._keys = sorted((n.casefold(), n) for n in names)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, name):
+        bisect.insort(self._keys, (name.casefold(), name))
+
+    def remove(self, name):
+        key = (name.casefold(), name)
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def _range(self, prefix):
+        p = prefix.casefold()
+        return bisect.bisect_left(self._keys, (p,)), bisect.bisect_left(self._keys, (p + '\U0010ffff',))
+
+    def count(self, prefix=''):
+        lo, hi = self._range(prefix)
+        return hi - lo
+
+    def slice(self, prefix='', start=0, k=None):
+        lo, hi = self._range(prefix)
+        a = lo + start
+        b = hi if k is None else min(hi, a + k)
+        return [n for _, n in self._keys[a:b]]
+
+    def position(self, name, prefix=''):
+        # row of `name` among the matches for `prefix` (where it would go if absent)
+        lo, _ = self._range(prefix)
+        return bisect.bisect_left(self._keys, (name.casefold(), name)) - lo
+
+#--- Sharded profile store ---
+# Each profile (with its history) lives in its own shard file under PROFILES_DIR;
+# index.json only maps names to shard files. Shards are read on first access and
+# kept in a small LRU cache, and saving a profile rewrites only its own shard.
+# Nothing is read until first use, so importing the module does no disk I/O.
+class ProfileStore:
+    def __init__(self, root_dir, legacy_path=None, cache_size=PROFILE_CACHE_SIZE):
+        self.root_dir = root_dir
+        self.index_path = os.path.join(root_dir, 'index.json')
+        self.legacy_path = legacy_path
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._idx = None
+        self._names = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def _index(self):
+        if self._idx is None:
+            with self._load_lock:
+                if self._idx is None:
+                    self._load_index()
+        return self._idx
+
+    def _load_index(self):
+        # built in locals and published _names first: readers skip the lock as
+        # soon as _idx is set, so everything must be ready by then
+        os.makedirs(self.root_dir, exist_ok=True)
+        idx = load_json_file(self.index_path, None)
+        if idx is None:
+            idx = {}
+            if self.legacy_path and os.path.exists(self.legacy_path):
+                self._migrate(self.legacy_path, idx)
+        self._names = NameIndex(idx)
+        self._idx = idx
+
+    def _migrate(self, legacy_path, idx):
+        for name, p in load_json_file(legacy_path, {}).items():
+            idx[name] = self._shard_name(name)
+            persistence.submit(os.path.join(self.root_dir, idx[name]), p)
+        persistence.submit(self.index_path, idx)
+        persistence.flush()  # shards must be on disk before the legacy file goes
+        try:
+            os.replace(legacy_path, legacy_path + '.bak')
+        except OSError:
+            pass
+
+    @staticmethod
+    def _shard_name(name):
+        return hashlib.sha1(name.encode('utf-8')).hexdigest()[:16] + '.json'
+
+    def _shard_path(self, name):
+        return os.path.join(self.root_dir, self._index[name])
+
+    def _write_shard(self, name, p):
+        persistence.submit(self._shard_path(name), p)
+
+    def _write_index(self):
+        persistence.submit(self.index_path, self._index)
+
+    def _remember(self, name, p):
+        self._cache[name] = p
+        self._cache.move_to_end(name)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def keys(self):
+        return self._index.keys()
+
+    def search(self, prefix='', start=0, k=None):
+        # names starting with `prefix` (case-insensitive), sorted, rows start..start+k
+        self._index
+        return self._names.slice(prefix, start, k)
+
+    def count(self, prefix=''):
+        self._index
+        return self._names.count(prefix)
+
+    def position(self, name, prefix=''):
+        self._index
+        return self._names.position(name, prefix)
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def get(self, name, default=None):
+        if name not in self._index:
+            return default
+        p = self._cache.get(name)
+        if p is None:
+            p = load_json_file(self._shard_path(name), None)
+            if p is None:
+                return default
+        self._remember(name, p)
+        return p
+
+    def __getitem__(self, name):
+        p = self.get(name)
+        if p is None:
+            raise KeyError(name)
+        return p
+
+    def __setitem__(self, name, p):
+        if name not in self._index:
+            self._index[name] = self._shard_name(name)
+            self._names.add(name)
+            self._write_index()
+        self._remember(name, p)
+        self._write_shard(name, p)
+
+    def save(self, name):
+        if name in self._cache:
+            self._write_shard(name, self._cache[name])
+
+    def pop(self, name, default=None):
+        if name not in self._index:
+            return default
+        p = self.get(name, default)
+        path = self._shard_path(name)
+        del self._index[name]
+        self._names.remove(name)
+        self._cache.pop(name, None)
+        self._write_index()
+        persistence.submit(path, None)
+        return p
+
+#--- Bounded profile history ---
+# p['history'] keeps only the last HISTORY_RAW_LIMIT raw {'score', 'time'} entries.
+# Older entries are folded into p['daily'] (per day), and days older than
+# HISTORY_DAILY_DAYS are folded again into p['weekly'] (per ISO week). A rollup is
+# {'count', 'total', 'best'}; a weekly one also keeps a rollup per weekday under
+# 'days', so day and week queries merged over all three tiers give the same
+# answers as the raw history. p['streak'] tracks consecutive active days.
+def _rollup_add(buckets, key, count, total, best):
+    b = buckets.get(key)
+    if b is None:
+        buckets[key] = {'count': count, 'total': total, 'best': best}
+    else:
+        b['count'] += count
+        b['total'] += total
+        b['best'] = max(b['best'], best)
+
+def _week_key(day):
+    y, w, _ = date.fromisoformat(day).isocalendar()
+    return f"{y}-W{w:02d}"
+
+def _streak_add(streak, day):
+    last = streak.get('last_day')
+    if last == day:
+        return
+    if last and date.fromisoformat(day) - date.fromisoformat(last) == timedelta(days=1):
+        streak['current'] += 1
+    elif last and day < last:
+        return  # out-of-order entry, streak only moves forward
+    else:
+        streak['current'] = 1
+    streak['last_day'] = day
+    streak['best'] = max(streak['best'], streak['current'])
+
+def history_compact(p):
+    raw = p.setdefault('history', [])
+    daily = p.setdefault('daily', {})
+    weekly = p.setdefault('weekly', {})
+    if 'streak' not in p:
+        p['streak'] = {'current': 0, 'best': 0, 'last_day': None}
+        for e in sorted(raw, key=lambda e: e['time']):
+            _streak_add(p['streak'], e['time'][:10])
+    if len(raw) > HISTORY_RAW_LIMIT:
+        cut = len(raw) - HISTORY_RAW_LIMIT
+        for e in raw[:cut]:
+            _rollup_add(daily, e['time'][:10], 1, e['score'], e['score'])
+        del raw[:cut]
+    if len(daily) > HISTORY_DAILY_DAYS:
+        for day in sorted(daily)[:len(daily) - HISTORY_DAILY_DAYS]:
+            b = daily.pop(day)
+            week = _week_key(day)
+            _rollup_add(weekly, week, b['count'], b['total'], b['best'])
+            _rollup_add(weekly[week].setdefault('days', {}), str(date.fromisoformat(day).weekday()), b['count'], b['total'], b['best'])
+    return p
+
+def history_append(p, score, when=None):
+    when = when or time.strftime('%Y-%m-%d %H:%M:%S')
+    history_compact(p)
+    p['history'].append({'score': score, 'time': when})
+    _streak_add(p['streak'], when[:10])
+    return history_compact(p)
+
+def _stats(count, total, best):
+    if not count:
+        return None
+    return {'count': count, 'mean': total / count, 'best': best}
+
+def _merge(acc, count, total, best):
+    acc[0] += count
+    acc[1] += total
+    if best is not None:
+        acc[2] = best if acc[2] is None else max(acc[2], best)
+
+def history_day_stats(p, day):
+    acc = [0, 0, None]
+    week = p.get('weekly', {}).get(_week_key(day), {})
+    for b in (week.get('days', {}).get(str(date.fromisoformat(day).weekday())), p.get('daily', {}).get(day)):
+        if b:
+            _merge(acc, b['count'], b['total'], b['best'])
+    for e in p.get('history', []):
+        if e['time'][:10] == day:
+            _merge(acc, 1, e['score'], e['score'])
+    return _stats(*acc)
+
+def history_week_stats(p, week):
+    acc = [0, 0, None]
+    b = p.get('weekly', {}).get(week)
+    if b:
+        _merge(acc, b['count'], b['total'], b['best'])
+    for day, b in p.get('daily', {}).items():
+        if _week_key(day) == week:
+            _merge(acc, b['count'], b['total'], b['best'])
+    for e in p.get('history', []):
+        if _week_key(e['time'][:10]) == week:
+            _merge(acc, 1, e['score'], e['score'])
+    return _stats(*acc)
+
+def history_summary(p):
+    count, total, best = 0, 0, None
+    for buckets in (p.get('weekly', {}), p.get('daily', {})):
+        for b in buckets.values():
+            count += b['count']
+            total += b['total']
+            best = b['best'] if best is None else max(best, b['best'])
+    for e in p.get('history', []):
+        count += 1
+        total += e['score']
+        best = e['score'] if best is None else max(best, e['score'])
+    s = _stats(count, total, best) or {'count': 0, 'mean': 0, 'best': None}
+    # a streak is only live if the last active day was today or yesterday
+    streak = p.get('streak', {})
+    last = streak.get('last_day')
+    live = last is not None and date.today() - date.fromisoformat(last) <= timedelta(days=1)
+    s['streak'] = streak.get('current', 0) if live else 0
+    s['best_streak'] = streak.get('best', 0)
+    return s
+
+#--- Progress charts ---
+# A profile's chart plots one mean per weekly and daily rollup, then every raw
+# score, oldest first. Long series are cut to CHART_POINTS with
+# Largest-Triangle-Three-Buckets, which keeps the peaks and dips that striding
+# would drop. Downsampled series are cached per profile until its next quiz.
+def history_series(p):
+    series = [b['total'] / b['count'] for _, b in sorted(p.get('weekly', {}).items())]
+    series += [b['total'] / b['count'] for _, b in sorted(p.get('daily', {}).items())]
+    series += [e['score'] for e in sorted(p.get('history', []), key=lambda e: e['time'])]
+    return series
+
+def lttb(values, threshold):
+    # values are y at x = 0..n-1; returns [(x, y)] always keeping both ends
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(enumerate(values))
+    out = [(0, values[0])]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        # the point picked in this bucket is judged against the next bucket's mean
+        nxt, nxt_end = end, min(int((i + 2) * every) + 1, n)
+        ax = (nxt + nxt_end - 1) / 2
+        ay = sum(values[nxt:nxt_end]) / (nxt_end - nxt)
+        ya = values[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((a - ax) * (values[j] - ya) - (a - j) * (ay - ya))
+            if area > best_area:
+                best, best_area = j, area
+        out.append((best, values[best]))
+        a = best
+    out.append((n - 1, values[-1]))
+    return out
+
+class SeriesCache:
+    # profile name -> (full series length, downsampled [(x, y)])
+    def __init__(self, points=CHART_POINTS, limit=CHART_CACHE_SIZE):
+        self.points = points
+        self.limit = limit
+        self._cache = {}
+
+    def get(self, name, p):
+        hit = self._cache.pop(name, None)
+        if hit is None:
+            values = history_series(p)
+            hit = (len(values), lttb(values, self.points))
+        self._cache[name] = hit   # re-insert as most recent
+        if len(self._cache) > self.limit:
+            del self._cache[next(iter(self._cache))]
+        return hit
+
+    def invalidate(self, name):
+        self._cache.pop(name, None)
+
+#--- Attempt log ---
+# Every answered question is one fixed-size little-endian record appended to
+# ATTEMPT_LOG, so millions of attempts can be scanned in chunks without ever
+# holding them in memory. Latency comes from the engine's monotonic clock.
+OUTCOME_WRONG, OUTCOME_FIRST, OUTCOME_SECOND, OUTCOME_SKIPPED, OUTCOME_TIMEOUT = range(5)
+OUTCOME_NAMES = ('wrong', 'first_try', 'second_try', 'skipped', 'timeout')
+NO_ANSWER = -2 ** 31
+ANSWER_LIMIT = 2 ** 31 - 1   # answers must fit the log's int32 field without colliding with NO_ANSWER
+
+def answer_in_range(n):
+    return -ANSWER_LIMIT <= n <= ANSWER_LIMIT
+DIFFICULTY_CODES = {name: i for i, name in enumerate(DIFFICULTY)}
+
+def profile_key(name):
+    return zlib.crc32(name.encode('utf-8')) if name else 0
+
+class AttemptLog:
+    MAGIC = b'MQA1'
+    # when (epoch s), profile key, latency ms, n1, n2, answer, operator code point, difficulty, outcome
+    RECORD = struct.Struct('<IIIiiiHBB')
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, name, difficulty, attempts, when=None):
+        # attempts are QuizEngine tuples: (n1, n2, op, answer, outcome, latency_ms)
+        when = int(when if when is not None else time.time())
+        pk, dc = profile_key(name), DIFFICULTY_CODES.get(difficulty, 255)
+        buf = bytearray()
+        for n1, n2, op, ans, outcome, ms in attempts:
+            buf += self.RECORD.pack(when, pk, min(ms, 0xFFFFFFFF), n1, n2, NO_ANSWER if ans is None else ans, ord(op), dc, outcome)
+        with self._lock, open(self.path, 'ab') as f:
+            if f.tell() == 0:
+                f.write(self.MAGIC)
+            f.write(buf)
+        return len(attempts)
+
+    def __len__(self):
+        try:
+            return max(0, os.path.getsize(self.path) - len(self.MAGIC)) // self.RECORD.size
+        except OSError:
+            return 0
+
+    def scan(self, chunk=8192):
+        # yields raw record tuples; reads `chunk` records at a time
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            if f.read(len(self.MAGIC)) != self.MAGIC:
+                raise ValueError(f"{self.path} is not an attempt log")
+            size = self.RECORD.size
+            while True:
+                block = f.read(size * chunk)
+                block = block[:len(block) - len(block) % size]  # ignore a torn final record
+                if not block:
+                    break
+                yield from self.RECORD.iter_unpack(block)
+
+def _latency_new():
+    return {'n': 0, 'correct': 0, 'ewma': None, 'hist': [0] * (len(LATENCY_BUCKETS_MS) + 1)}
+
+def _latency_update(s, latency_ms, correct):
+    s['n'] += 1
+    s['correct'] += correct
+    s['ewma'] = latency_ms if s['ewma'] is None else s['ewma'] + LATENCY_EWMA_ALPHA * (latency_ms - s['ewma'])
+    s['hist'][bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+def latency_percentile(s, q):
+    # upper edge of the histogram bucket holding the q-th quantile (None past the last edge)
+    target, seen = q * s['n'], 0
+    for i, c in enumerate(s['hist']):
+        seen += c
+        if c and seen >= target:
+            return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else None
+    return None
+
+def latency_record(p, difficulty, attempts):
+    # fold a finished quiz into the profile's per "op|difficulty" response-time stats;
+    # skipped and timed-out questions say nothing about speed and are left out
+    stats = p.setdefault('latency', {})
+    for n1, n2, op, ans, outcome, ms in attempts:
+        if outcome in (OUTCOME_SKIPPED, OUTCOME_TIMEOUT):
+            continue
+        s = stats.get(f"{op}|{difficulty}")
+        if s is None:
+            s = stats[f"{op}|{difficulty}"] = _latency_new()
+        _latency_update(s, ms, outcome != OUTCOME_WRONG)
+    return p
+
+def latency_by_operator(p):
+    # n-weighted mean of the EWMAs across difficulties, in seconds
+    out = {}
+    for key, s in p.get('latency', {}).items():
+        op = key.split('|', 1)[0]
+        n, total = out.get(op, (0, 0.0))
+        out[op] = (n + s['n'], total + s['ewma'] * s['n'])
+    return {op: total / n / 1000 for op, (n, total) in out.items() if n}
+
+def summarize_attempts(log, chunk=8192):
+    # one streaming pass over the log; memory is per (op, difficulty) group only
+    groups = {}
+    names = {v: k for k, v in DIFFICULTY_CODES.items()}
+    total = 0
+    for when, pk, ms, n1, n2, ans, op, dc, outcome in log.scan(chunk):
+        total += 1
+        key = f"{chr(op)}|{names.get(dc, '?')}"
+        g = groups.get(key)
+        if g is None:
+            g = groups[key] = dict(_latency_new(), outcomes=[0] * len(OUTCOME_NAMES), profiles=set())
+        g['outcomes'][outcome] += 1
+        g['profiles'].add(pk)
+        if outcome not in (OUTCOME_SKIPPED, OUTCOME_TIMEOUT):
+            _latency_update(g, ms, outcome != OUTCOME_WRONG)
+    report = {}
+    for key, g in sorted(groups.items()):
+        report[key] = {
+            'answered': g['n'],
+            'accuracy': g['correct'] / g['n'] if g['n'] else None,
+            'ewma_ms': g['ewma'],
+            'p50_ms': latency_percentile(g, 0.5),
+            'p90_ms': latency_percentile(g, 0.9),
+            'outcomes': dict(zip(OUTCOME_NAMES, g['outcomes'])),
+            'profiles': len(g['profiles']),
+        }
+    return {'attempts': total, 'groups': report}
+
+#--- Global statistics ---
+# Class-wide aggregates kept in STATS_FILE and updated once per finished quiz, so
+# the statistics screen reads a few counters instead of scanning every profile
+# and the whole leaderboard. On first run they are backfilled once from the
+# leaderboard (which has no quiz times or achievements, so those start at zero).
+# Unlocks are counted once per distinct player name, so rates never pass 100%;
+# everyone playing without a profile shares the name 'Guest' and counts as one.
+class GlobalStats:
+    def __init__(self, path, backfill=None):
+        self.path = path
+        self.backfill = backfill
+        self.data = None
+        self._players = set()
+        self._unlocked = {}   # achievement id -> set of player names
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _empty():
+        return {'quizzes': 0, 'difficulty': {}, 'achievements': {}, 'players': [], 'daily': {}}
+
+    def ensure_loaded(self):
+        with self._lock:
+            if self.data is not None:
+                return
+            data = load_json_file(self.path, None)
+            if data is None:
+                self.data = self._empty()
+                for rec in (self.backfill() if self.backfill else ()):
+                    self.record(rec.get('name', 'Guest'), rec.get('difficulty', '-'), rec.get('score', 0),
+                                QUESTIONS_PER_QUIZ * 10, None, (), rec.get('time'), save=False)
+                persistence.submit(self.path, self.data)
+            else:
+                self.data = data
+            # older files kept raw unlock counts, which can't be de-duplicated
+            self.data['achievements'] = {a: names for a, names in self.data['achievements'].items() if isinstance(names, list)}
+            self._players = set(self.data['players'])
+            self._unlocked = {a: set(names) for a, names in self.data['achievements'].items()}
+
+    def record(self, name, difficulty, score, max_score, total_time, earned, when=None, save=True):
+        with self._lock:
+            self.ensure_loaded()
+            data = self.data
+            data['quizzes'] += 1
+            d = data['difficulty'].get(difficulty)
+            if d is None:
+                d = data['difficulty'][difficulty] = {'count': 0, 'score_total': 0, 'time_total': 0, 'timed': 0, 'hist': [0] * STATS_BINS}
+            d['count'] += 1
+            d['score_total'] += score
+            if total_time is not None:
+                d['time_total'] += total_time
+                d['timed'] += 1
+            pct = score / max_score * 100 if max_score else 0
+            d['hist'][min(int(pct // 10), STATS_BINS - 1)] += 1
+            for a in earned:
+                owners = self._unlocked.setdefault(a, set())
+                if name not in owners:
+                    owners.add(name)
+                    data['achievements'].setdefault(a, []).append(name)
+            if name not in self._players:
+                self._players.add(name)
+                data['players'].append(name)
+            day = (when or time.strftime('%Y-%m-%d'))[:10]
+            active = data['daily'].get(day)
+            if active is None:
+                active = data['daily'][day] = []
+                if len(data['daily']) > STATS_DAYS:
+                    for old in sorted(data['daily'])[:len(data['daily']) - STATS_DAYS]:
+                        del data['daily'][old]
+            if name not in active:
+                active.append(name)
+            if save:
+                persistence.submit(self.path, data)
+
+    def summary(self, days=14):
+        with self._lock:
+            self.ensure_loaded()
+            data = self.data
+            by_diff = {}
+            for diff, d in data['difficulty'].items():
+                by_diff[diff] = {
+                    'count': d['count'],
+                    'mean_score': d['score_total'] / d['count'] if d['count'] else 0,
+                    'mean_time': d['time_total'] / d['timed'] if d['timed'] else None,
+                    'hist': list(d['hist']),
+                }
+            players = len(self._players)
+            unlocks = {a['id']: len(self._unlocked.get(a['id'], ())) for a in ACHIEVEMENTS_DEF}
+            today = date.today()
+            recent = [(today - timedelta(days=i)).isoformat() for i in range(days - 1, -1, -1)]
+            daily = [(day, len(data['daily'].get(day, ()))) for day in recent]
+            return {
+                'quizzes': data['quizzes'],
+                'players': players,
+                'difficulty': by_diff,
+                'achievements': {a: (n, n / players if players else 0) for a, n in unlocks.items()},
+                'daily': daily,
+            }
+
+def _stats_backfill():
+    leaderboard_log.ensure_loaded()
+    return list(leaderboard_log.records)
 
 #--- Leaderboard and profiles ---
-leaderboard = load_json_file(LEADERBOARD_FILE, [])
-profiles = load_json_file(PROFILES_FILE, {})  # dict: username -> profile data
+# Both are loaded lazily (the app starts the loads on a background thread);
+# always reach the index through leaderboard_log.index, as loading replaces it.
+leaderboard_log = LeaderboardLog(LEADERBOARD_FILE, LEADERBOARD_LOG)
+profiles = ProfileStore(PROFILES_DIR, legacy_path=PROFILES_FILE)  # username -> profile data
+attempt_log = AttemptLog(ATTEMPT_LOG)
+global_stats = GlobalStats(STATS_FILE, backfill=_stats_backfill)
+progress_charts = SeriesCache()
 
 #--- Sound helpers (KEPT ORIGINAL) ---
 def _bell_if_possible():
@@ -93,6 +1217,1021 @@ else:
     def play_sound_wrong():
         pass
 
+#--- Question generation ---
+# Operators are pluggable: OPERATORS maps a symbol to (apply, shape), where shape
+# turns two raw operands drawn from the difficulty range into a valid problem.
+# A quiz is generated in one pass from a seed, so storing (seed, difficulty, ops)
+# is enough to replay it exactly.
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+def _shape_sub(a, b):
+    return (a, b) if a >= b else (b, a)  # no negative answers
+
+def _shape_div(a, b):
+    return (a * b, b)  # dividend = quotient * divisor, so the answer is exact
+
+OPERATORS = {
+    '+': (lambda a, b: a + b, None),
+    '-': (lambda a, b: a - b, _shape_sub),
+    '×': (lambda a, b: a * b, None),
+    '÷': (lambda a, b: a // b, _shape_div),
+}
+OPERATIONS = {
+    'Addition & Subtraction': '+-',
+    'Multiplication': '×',
+    'Division': '÷',
+    'Mixed': '+-×÷',
+}
+
+def register_operator(symbol, apply, shape=None):
+    OPERATORS[symbol] = (apply, shape)
+
+def solve(problem):
+    n1, n2, op = problem
+    return OPERATORS[op][0](n1, n2)
+
+def _make(op, a, b):
+    shape = OPERATORS[op][1]
+    if shape:
+        a, b = shape(a, b)
+    return (a, b, op)
+
+def generate_quiz(seed, difficulty='Moderate', ops='+-', n=QUESTIONS_PER_QUIZ):
+    # deterministic for a given seed; no problem repeats within the quiz
+    rng = random.Random(seed)
+    lo, hi = DIFFICULTY.get(difficulty, (1, 99))
+    ops = list(ops)
+    out, seen = [], set()
+    retries = n * 20  # tiny ranges (e.g. Easy division) may not have n distinct problems
+    while len(out) < n:
+        a, b = rng.randint(lo, hi), rng.randint(lo, hi)
+        p = _make(rng.choice(ops), a, b)
+        if p in seen and retries > 0:
+            retries -= 1
+            continue
+        seen.add(p)
+        out.append(p)
+    return out
+
+def generate_pool(seed, difficulty='Moderate', ops='+-', n=1000000, vectorized=True):
+    # bulk problems as three columns (n1, n2, op); numpy-backed when available
+    lo, hi = DIFFICULTY.get(difficulty, (1, 99))
+    ops = list(ops)
+    if NUMPY_AVAILABLE and vectorized is not False:
+        rng = np.random.default_rng(seed)
+        a = rng.integers(lo, hi + 1, n)
+        b = rng.integers(lo, hi + 1, n)
+        op_idx = rng.integers(0, len(ops), n)
+        op_col = np.array(ops)[op_idx]
+        if '-' in ops:
+            swap = (op_col == '-') & (a < b)
+            a[swap], b[swap] = b[swap], a[swap]
+        if '÷' in ops:
+            div = op_col == '÷'
+            a[div] = a[div] * b[div]
+        for sym in ops:
+            if sym not in '+-×÷' and OPERATORS[sym][1]:
+                for i in np.nonzero(op_col == sym)[0]:
+                    a[i], b[i], _ = _make(sym, int(a[i]), int(b[i]))
+        return a, b, op_col
+    rng = random.Random(seed)
+    col_a, col_b, col_op = [], [], []
+    for _ in range(n):
+        p = _make(rng.choice(ops), rng.randint(lo, hi), rng.randint(lo, hi))
+        col_a.append(p[0]); col_b.append(p[1]); col_op.append(p[2])
+    return col_a, col_b, col_op
+
+def write_worksheets(path, students, difficulty='Moderate', ops='+-', n=20, seed=None):
+    # one printable page per student plus an answer-key page each; every sheet
+    # prints its own seed so it can be regenerated later
+    import html
+    base = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("<!DOCTYPE html><html><head><meta charset='utf-8'><title>Worksheets</title>"
+                "<style>body{font-family:sans-serif}section{page-break-after:always}"
+                "ol{columns:2;font-size:18px;line-height:2.2}</style></head><body>\n")
+        for name in students:
+            sheet_seed = base.randrange(2 ** 32)
+            problems = generate_quiz(sheet_seed, difficulty, ops, n)
+            title = f"{html.escape(str(name))} &mdash; {difficulty}"
+            f.write(f"<section><h2>{title}</h2><p>Sheet #{sheet_seed}</p><ol>")
+            f.write("".join(f"<li>{a} {op} {b} = ______</li>" for a, b, op in problems))
+            f.write(f"</ol></section>\n<section><h2>Answers: {title}</h2><p>Sheet #{sheet_seed}</p><ol>")
+            f.write("".join(f"<li>{a} {op} {b} = {solve((a, b, op))}</li>" for a, b, op in problems))
+            f.write("</ol></section>\n")
+        f.write("</body></html>\n")
+
+#--- Achievement rules ---
+# Each achievement in ACHIEVEMENTS_DEF gets a rule object that keeps a few
+# counters, updated once per answered question. Nothing looks back over the
+# attempt history, so a new rule costs O(1) per answer however many there are.
+class AchievementRule:
+    def __init__(self, **params):
+        self.params = params
+
+    def on_answer(self, correct, points, time_taken):
+        pass
+
+    def met(self, summary):
+        return False
+
+class TotalTimeRule(AchievementRule):
+    def met(self, summary):
+        return 0 < summary['total_time'] <= self.params['max_seconds']
+
+class PercentRule(AchievementRule):
+    # optional "difficulty" turns this into a per-difficulty goal
+    def met(self, summary):
+        diff = self.params.get('difficulty')
+        if diff and summary['difficulty'] != diff:
+            return False
+        return summary['percent'] >= self.params['min_percent']
+
+class NoWrongRule(AchievementRule):
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.answered = 0
+        self.wrong = 0
+
+    def on_answer(self, correct, points, time_taken):
+        self.answered += 1
+        self.wrong += not correct
+
+    def met(self, summary):
+        return self.answered > 0 and self.wrong == 0
+
+class ComebackRule(AchievementRule):
+    # behind after the first `window` questions, yet finishes at `reach`%
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.seen = 0
+        self.early_points = 0
+
+    def on_answer(self, correct, points, time_taken):
+        if self.seen < self.params['window']:
+            self.early_points += points
+        self.seen += 1
+
+    def met(self, summary):
+        window = self.params['window']
+        if self.seen < window:
+            return False
+        early_pct = self.early_points / (window * 10) * 100
+        return early_pct < self.params['below'] and summary['percent'] >= self.params['reach']
+
+class StreakRule(AchievementRule):
+    # `length` first-try answers in a row
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.run = 0
+        self.best = 0
+
+    def on_answer(self, correct, points, time_taken):
+        self.run = self.run + 1 if points == 10 else 0
+        self.best = max(self.best, self.run)
+
+    def met(self, summary):
+        return self.best >= self.params['length']
+
+ACHIEVEMENT_RULES = {
+    'total_time': TotalTimeRule,
+    'percent': PercentRule,
+    'no_wrong': NoWrongRule,
+    'comeback': ComebackRule,
+    'streak': StreakRule,
+}
+
+def register_achievement_rule(name, cls):
+    ACHIEVEMENT_RULES[name] = cls
+
+class AchievementTracker:
+    def __init__(self, defs=None):
+        self.rules = [(d['id'], ACHIEVEMENT_RULES[d['rule']](**d.get('params', {})))
+                      for d in (ACHIEVEMENTS_DEF if defs is None else defs)]
+
+    def on_answer(self, correct, points, time_taken):
+        for _, rule in self.rules:
+            rule.on_answer(correct, points, time_taken)
+
+    def earned(self, summary, owned=()):
+        return [aid for aid, rule in self.rules if aid not in owned and rule.met(summary)]
+
+#--- Headless quiz engine ---
+# The quiz rules without any widgets: the app (or the simulator below) feeds it
+# events - answer, skip, timeout, advance - with a timestamp, and reads back the
+# outcome. Nothing here touches Tk or schedules callbacks.
+class QuizEngine:
+    def __init__(self, difficulty='Moderate', timer_seconds=15, questions=QUESTIONS_PER_QUIZ, ops='+-', seed=None, clock=time.monotonic):
+        self.difficulty = difficulty
+        self.timer_seconds = timer_seconds
+        self.questions = questions
+        self.ops = ops
+        self.seed = seed
+        self.problems = []
+        self.clock = clock
+        self.score = 0
+        self.question_index = 0
+        self.first_attempt = True
+        self.current_problem = None
+        self.attempts = []  # (n1, n2, op, answer, outcome, latency_ms) per question
+        self.wrong = 0
+        self.achievements = AchievementTracker()
+        self.start_time = None
+        self.question_start = None
+
+    @property
+    def finished(self):
+        return self.question_index >= self.questions
+
+    @property
+    def max_score(self):
+        return self.questions * 10
+
+    @property
+    def percent(self):
+        return (self.score / self.max_score) * 100 if self.questions > 0 else 0
+
+    def _now(self, now):
+        return self.clock() if now is None else now
+
+    def start(self, now=None):
+        if self.seed is None:
+            self.seed = random.randrange(2 ** 32)
+        self.problems = generate_quiz(self.seed, self.difficulty, self.ops, self.questions)
+        self.score = 0
+        self.question_index = 0
+        self.attempts = []
+        self.wrong = 0
+        self.achievements = AchievementTracker()
+        self.start_time = self._now(now)
+        return self._next_problem(self.start_time)
+
+    def _next_problem(self, now=None):
+        if self.finished:
+            self.current_problem = None
+            return None
+        self.current_problem = self.problems[self.question_index]
+        self.first_attempt = True
+        self.question_start = self._now(now)
+        return self.current_problem
+
+    def advance(self, now=None):
+        # move past the current question; returns the next problem or None when done
+        self.question_index += 1
+        return self._next_problem(now)
+
+    def correct_answer(self):
+        if not self.current_problem:
+            return None
+        return solve(self.current_problem)
+
+    def elapsed(self, now=None):
+        return int(self._now(now) - self.start_time) if self.start_time is not None else 0
+
+    def _record(self, user_ans, outcome, now, points=0):
+        if not self.current_problem:
+            return
+        n1, n2, op = self.current_problem
+        latency = self._now(now) - self.question_start
+        ok = outcome in (OUTCOME_FIRST, OUTCOME_SECOND)
+        self.attempts.append((n1, n2, op, user_ans, outcome, int(latency * 1000)))
+        self.wrong += not ok
+        self.achievements.on_answer(ok, points, latency)
+
+    def answer(self, user_ans, now=None):
+        # returns ('correct', points), ('retry', 0) or ('wrong', 0)
+        if user_ans == self.correct_answer():
+            points = 10 if self.first_attempt else 5
+            self.score += points
+            self._record(user_ans, OUTCOME_FIRST if self.first_attempt else OUTCOME_SECOND, now, points)
+            return 'correct', points
+        if self.first_attempt:
+            self.first_attempt = False
+            return 'retry', 0
+        self._record(user_ans, OUTCOME_WRONG, now)
+        return 'wrong', 0
+
+    def skip(self, now=None):
+        self._record(None, OUTCOME_SKIPPED, now)
+        return 'skipped', 0
+
+    def timeout(self, now=None):
+        self._record(None, OUTCOME_TIMEOUT, now)
+        return 'timeout', 0
+
+    def finish(self, now=None, owned=()):
+        total_time = self.elapsed(now)
+        pct = self.percent
+        return {
+            'score': self.score,
+            'percent': pct,
+            'total_time': total_time,
+            'perfect': bool(self.attempts) and self.wrong == 0,
+            'earned': self.achievements.earned({'total_time': total_time, 'percent': pct, 'difficulty': self.difficulty}, owned),
+        }
+
+#--- Simulation harness ---
+# Replays synthetic players against QuizEngine on a virtual clock, so scoring and
+# achievements can be load-tested without a display:
+#     python 01-MathsQuiz.py --simulate 10000 --accuracy 0.8 --latency 1 6
+def simulate(players=1000, accuracy=0.8, latency=(1.0, 6.0), difficulty='Moderate',
+             timer_seconds=15, seed=None, ops='+-'):
+    rng = random.Random(seed)
+    scores = {}
+    unlocked = {a['id']: 0 for a in ACHIEVEMENTS_DEF}
+    answers = 0
+    started = time.perf_counter()
+    for _ in range(players):
+        clock = 0.0
+        engine = QuizEngine(difficulty, timer_seconds, ops=ops, seed=rng.randrange(2 ** 32))
+        engine.start(clock)
+        while not engine.finished:
+            spent = 0.0  # the timer covers every try at a question, retries included
+            while True:
+                think = rng.uniform(*latency)
+                if spent + think > timer_seconds:
+                    clock += timer_seconds - spent
+                    engine.timeout(clock)
+                    break
+                spent += think
+                clock += think
+                answers += 1
+                guess = engine.correct_answer() if rng.random() < accuracy else engine.correct_answer() + 1
+                outcome, _ = engine.answer(guess, clock)
+                if outcome != 'retry':
+                    break
+            engine.advance(clock)
+        result = engine.finish(clock)
+        scores[result['score']] = scores.get(result['score'], 0) + 1
+        for a in result['earned']:
+            unlocked[a] += 1
+    elapsed = time.perf_counter() - started
+    return {
+        'players': players,
+        'answers': answers,
+        'seconds': elapsed,
+        'players_per_sec': players / elapsed if elapsed else float('inf'),
+        'mean_score': sum(k * v for k, v in scores.items()) / players if players else 0,
+        'score_histogram': dict(sorted(scores.items())),
+        'achievements': unlocked,
+    }
+
+#--- Class quiz server ---
+# Hosts synchronised rounds for a whole class over TCP, one JSON object per line.
+# Every player gets a QuizEngine seeded like everyone else, so the questions and
+# scoring are exactly those of the desktop quiz; the server owns the clock, closes
+# each question when its timer runs out (or everyone has answered) and pushes the
+# live standings. Start it with `--serve`, or measure it with `--load-test 300`.
+#
+#   client -> server  {"type": "join", "name": ...}
+#                     {"type": "answer", "q": 3, "answer": 42} / {"type": "skip", "q": 3}
+#   server -> client  welcome, round, question, ack, leaderboard, round_end, bye
+CLASS_PORT = 8765
+CLASS_PUSH_SECONDS = 0.5      # at most one leaderboard push per interval
+CLASS_MAX_BUFFER = 256 * 1024 # drop clients that stop reading
+
+def _encode(msg):
+    return (json.dumps(msg, separators=(',', ':')) + '\n').encode('utf-8')
+
+class ClassPlayer:
+    def __init__(self, pid, name, writer):
+        self.pid = pid
+        self.name = name
+        self.writer = writer
+        self.engine = None
+        self.done = True
+
+class QuizServer:
+    def __init__(self, host='0.0.0.0', port=CLASS_PORT, difficulty='Moderate', ops='+-', questions=QUESTIONS_PER_QUIZ,
+                 timer_seconds=15, seed=None, rounds=1, min_players=1, lobby_seconds=10.0, gap=1.5, record=True):
+        self.host, self.port = host, port
+        self.difficulty, self.ops, self.questions = difficulty, ops, questions
+        self.timer_seconds, self.seed, self.rounds = timer_seconds, seed, rounds
+        self.min_players, self.lobby_seconds, self.gap = min_players, lobby_seconds, gap
+        self.record = record
+        self.players = {}
+        self.question = None
+        self._next_id = 0
+        self._joined = None
+        self._all_done = None
+        self._board_dirty = False
+        self._handlers = set()
+        self.ready = None
+
+    def send(self, player, msg):
+        self._write(player, _encode(msg))
+
+    def broadcast(self, msg):
+        data = _encode(msg)
+        for p in list(self.players.values()):
+            self._write(p, data)
+
+    def _write(self, player, data):
+        transport = player.writer.transport
+        if transport.is_closing():
+            return
+        if transport.get_write_buffer_size() > CLASS_MAX_BUFFER:
+            transport.abort()
+            return
+        player.writer.write(data)
+
+    def standings(self, k=10):
+        rows = sorted(((p.engine.score, p.name) for p in self.players.values() if p.engine), key=lambda r: (-r[0], r[1]))
+        return [[name, score] for score, name in rows[:k]]
+
+    async def _handle(self, reader, writer):
+        player = None
+        self._handlers.add(asyncio.current_task())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(msg, dict):
+                    if player is not None:
+                        self.send(player, {'type': 'ack', 'q': None, 'result': 'invalid', 'points': 0,
+                                           'score': player.engine.score if player.engine else 0})
+                    continue
+                kind = msg.get('type')
+                if kind == 'join' and player is None:
+                    self._next_id += 1
+                    player = ClassPlayer(self._next_id, str(msg.get('name') or 'Guest')[:24], writer)
+                    self.players[player.pid] = player
+                    self.send(player, {'type': 'welcome', 'id': player.pid, 'players': len(self.players)})
+                    if len(self.players) >= self.min_players:
+                        self._joined.set()
+                elif kind in ('answer', 'skip') and player is not None:
+                    self._on_answer(player, msg)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # ValueError: a line over the stream limit, so drop the client
+        finally:
+            if player is not None:
+                self.players.pop(player.pid, None)
+                self._check_all_done()
+            writer.close()
+            self._handlers.discard(asyncio.current_task())
+
+    def _on_answer(self, player, msg):
+        now = asyncio.get_running_loop().time()
+        engine = player.engine
+        if engine is None or player.done or msg.get('q') != self.question:
+            self.send(player, {'type': 'ack', 'q': msg.get('q'), 'result': 'late', 'points': 0,
+                               'score': engine.score if engine else 0})
+            return
+        correct = engine.correct_answer()
+        if msg['type'] == 'skip':
+            result, points = engine.skip(now)
+        else:
+            try:
+                value = int(msg.get('answer'))
+                if not answer_in_range(value):
+                    raise ValueError(value)
+            except (TypeError, ValueError, OverflowError):
+                self.send(player, {'type': 'ack', 'q': self.question, 'result': 'invalid', 'points': 0, 'score': engine.score})
+                return
+            result, points = engine.answer(value, now)
+        ack = {'type': 'ack', 'q': self.question, 'result': result, 'points': points, 'score': engine.score}
+        if result != 'retry':
+            player.done = True
+            if result != 'correct':
+                ack['correct'] = correct
+        self.send(player, ack)
+        self._board_dirty = self._board_dirty or points > 0
+        self._check_all_done()
+
+    def _check_all_done(self):
+        if self._all_done is not None and all(p.done for p in self.players.values()):
+            self._all_done.set()
+
+    async def _push_board(self):
+        while True:
+            await asyncio.sleep(CLASS_PUSH_SECONDS)
+            if self._board_dirty:
+                self._board_dirty = False
+                self.broadcast({'type': 'leaderboard', 'rows': self.standings()})
+
+    async def _run_round(self, n):
+        loop = asyncio.get_running_loop()
+        seed = self.seed + n if self.seed is not None else random.randrange(2 ** 32)
+        playing = list(self.players.values())
+        now = loop.time()
+        for p in playing:
+            p.engine = QuizEngine(self.difficulty, self.timer_seconds, self.questions, self.ops, seed, clock=loop.time)
+            p.engine.start(now)
+        self.broadcast({'type': 'round', 'round': n + 1, 'rounds': self.rounds, 'seed': seed, 'difficulty': self.difficulty,
+                        'ops': self.ops, 'questions': self.questions, 'timer': self.timer_seconds})
+        for q in range(self.questions):
+            now = loop.time()
+            playing = [p for p in self.players.values() if p.engine]
+            for p in playing:
+                if q:
+                    p.engine.advance(now)
+                p.done = False
+            n1, n2, op = playing[0].engine.current_problem if playing else (0, 0, '+')
+            self.question = q
+            self._all_done = asyncio.Event()
+            self.broadcast({'type': 'question', 'q': q, 'text': f"{n1} {op} {n2}", 'remaining': self.timer_seconds})
+            self._check_all_done()
+            try:
+                await asyncio.wait_for(self._all_done.wait(), self.timer_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._all_done = None
+            now = loop.time()
+            for p in self.players.values():
+                if p.engine and not p.done:
+                    correct = p.engine.correct_answer()
+                    p.engine.timeout(now)
+                    p.done = True
+                    self.send(p, {'type': 'ack', 'q': q, 'result': 'timeout', 'points': 0, 'score': p.engine.score, 'correct': correct})
+            self.question = None
+            self._board_dirty = False
+            self.broadcast({'type': 'leaderboard', 'rows': self.standings()})
+            await asyncio.sleep(self.gap)
+
+        now = loop.time()
+        finished = [(p, p.engine.finish(now)) for p in self.players.values() if p.engine]
+        finished.sort(key=lambda pr: (-pr[1]['score'], pr[1]['total_time']))
+        for rank, (p, res) in enumerate(finished, start=1):
+            self.send(p, {'type': 'round_end', 'round': n + 1, 'score': res['score'], 'max_score': p.engine.max_score,
+                          'total_time': res['total_time'], 'rank': rank, 'players': len(finished)})
+        if self.record and finished:
+            await loop.run_in_executor(None, self._record_round, [(p.name, p.engine, res) for p, res in finished])
+        for p in self.players.values():
+            p.engine = None
+
+    def _record_round(self, results):
+        when = time.strftime('%Y-%m-%d %H:%M:%S')
+        # one player's bad record must not cost the others theirs, or end the session
+        for name, engine, res in results:
+            try:
+                leaderboard_log.append({'name': name, 'score': engine.score, 'difficulty': engine.difficulty, 'time': when,
+                                        'seed': engine.seed, 'ops': engine.ops})
+                global_stats.record(name, engine.difficulty, engine.score, engine.max_score, res['total_time'], res['earned'], when)
+                attempt_log.append(name, engine.difficulty, engine.attempts)
+            except Exception as e:
+                print(f"Failed recording the round for {name}: {e}")
+
+    async def serve(self):
+        self._joined = asyncio.Event()
+        self.ready = self.ready or asyncio.Event()
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self.ready.set()
+        pusher = asyncio.ensure_future(self._push_board())
+        try:
+            for n in range(self.rounds):
+                await self._joined.wait()
+                # lobby: give stragglers a moment once the minimum is reached
+                await asyncio.sleep(self.lobby_seconds if n == 0 else self.gap)
+                await self._run_round(n)
+            self.broadcast({'type': 'bye'})
+            for p in list(self.players.values()):
+                await p.writer.drain()
+        finally:
+            pusher.cancel()
+            server.close()
+            for p in list(self.players.values()):
+                p.writer.close()
+            if self._handlers:
+                await asyncio.wait(list(self._handlers), timeout=2)
+            await server.wait_closed()
+
+async def quiz_bot(host, port, name, accuracy=0.8, latency=(0.2, 1.0), seed=None):
+    # headless player: answers after a random think time and times each answer -> ack
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+    problems, acks, scores = [], [], []
+    sent = {}
+
+    async def answer(q, retry=False):
+        await asyncio.sleep(rng.uniform(*latency) / (2 if retry else 1))
+        right = solve(problems[q])
+        sent[q] = loop.time()
+        writer.write(_encode({'type': 'answer', 'q': q, 'answer': right if rng.random() < accuracy else right + 1}))
+
+    writer.write(_encode({'type': 'join', 'name': name}))
+    tasks = []
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            msg = json.loads(line)
+            kind = msg['type']
+            if kind == 'round':
+                problems = generate_quiz(msg['seed'], msg['difficulty'], msg['ops'], msg['questions'])
+            elif kind == 'question':
+                tasks.append(asyncio.ensure_future(answer(msg['q'])))
+            elif kind == 'ack':
+                if msg['q'] in sent:
+                    acks.append(loop.time() - sent.pop(msg['q']))
+                if msg['result'] == 'retry':
+                    tasks.append(asyncio.ensure_future(answer(msg['q'], retry=True)))
+            elif kind == 'round_end':
+                scores.append(msg['score'])
+            elif kind == 'bye':
+                break
+    finally:
+        for t in tasks:
+            t.cancel()
+        writer.close()
+    return {'acks': acks, 'scores': scores}
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def class_load_test(players=300, accuracy=0.8, latency=(0.2, 1.0), difficulty='Moderate', ops='+-',
+                    questions=QUESTIONS_PER_QUIZ, timer_seconds=3, seed=None):
+    # runs a server and `players` bots in one event loop on an ephemeral port
+    async def run():
+        server = QuizServer('127.0.0.1', 0, difficulty, ops, questions, timer_seconds, seed, rounds=1,
+                            min_players=players, lobby_seconds=0.2, gap=0.2, record=False)
+        server.ready = asyncio.Event()
+        serving = asyncio.ensure_future(server.serve())
+        await server.ready.wait()
+        started = time.perf_counter()
+        bots = await asyncio.gather(*(quiz_bot('127.0.0.1', server.port, f'bot{i}', accuracy, latency,
+                                               None if seed is None else seed + i) for i in range(players)))
+        await serving
+        return bots, time.perf_counter() - started
+
+    bots, elapsed = asyncio.run(run())
+    acks = sorted(a for b in bots for a in b['acks'])
+    scores = [s for b in bots for s in b['scores']]
+    ms = lambda v: None if v is None else round(v * 1000, 2)
+    return {
+        'players': players,
+        'finished': len(scores),
+        'answers': len(acks),
+        'seconds': elapsed,
+        'ack_p50_ms': ms(_percentile(acks, 0.5)),
+        'ack_p95_ms': ms(_percentile(acks, 0.95)),
+        'ack_p99_ms': ms(_percentile(acks, 0.99)),
+        'ack_max_ms': ms(acks[-1] if acks else None),
+        'mean_score': sum(scores) / len(scores) if scores else 0,
+    }
+
+class ClassClient:
+    # blocking socket for the Tk app; a reader thread queues messages for the UI to poll
+    def __init__(self, host, port=CLASS_PORT, timeout=5):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.settimeout(None)
+        self.inbox = queue.Queue()
+        self._send_lock = threading.Lock()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        try:
+            with self.sock.makefile('r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self.inbox.put(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        self.inbox.put({'type': 'closed'})
+
+    def send(self, msg):
+        with self._send_lock:
+            self.sock.sendall(_encode(msg))
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+#--- Frame scheduler ---
+# One after() loop drives every timed thing in the app. Tickers are called each
+# frame with the current monotonic time and return how soon they next want to
+# run (seconds); one-shot callbacks are kept as absolute deadlines. Because time
+# is always read from time.monotonic(), a late frame shortens the wait for the
+# next one instead of making the countdown drift.
+class FrameScheduler:
+    MIN_INTERVAL = 0.016
+    MAX_INTERVAL = 0.25
+
+    def __init__(self, tk, clock=time.monotonic):
+        self.tk = tk
+        self.clock = clock
+        self._tickers = {}
+        self._timers = []   # heap of (deadline, seq, callback)
+        self._seq = 0
+        self._after_id = None
+        self._wake_at = None
+
+    def add_ticker(self, key, fn):
+        self._tickers[key] = fn
+        self._reschedule(self.clock())
+
+    def remove_ticker(self, key):
+        self._tickers.pop(key, None)
+
+    def call_later(self, delay, callback):
+        self._seq += 1
+        heapq.heappush(self._timers, (self.clock() + delay, self._seq, callback))
+        self._reschedule(self.clock())
+        return self._seq
+
+    def cancel(self, handle):
+        self._timers = [t for t in self._timers if t[1] != handle]
+        heapq.heapify(self._timers)
+
+    def _reschedule(self, now, wants=None):
+        if not self._tickers and not self._timers:
+            return
+        wake = now + (wants if wants is not None else self.MIN_INTERVAL)
+        if self._timers:
+            wake = min(wake, self._timers[0][0])
+        if self._after_id is not None:
+            if self._wake_at is not None and self._wake_at <= wake:
+                return
+            self.tk.after_cancel(self._after_id)
+        self._wake_at = wake
+        self._after_id = self.tk.after(max(1, int((wake - now) * 1000)), self._tick)
+
+    def _tick(self):
+        now = self.clock()
+        self._after_id = self._wake_at = None
+
+        # One failing callback is reported and skipped; the rest still run and the
+        # next frame is always booked.
+        wants = self.MAX_INTERVAL
+        try:
+            while self._timers and self._timers[0][0] <= now:
+                _, _, cb = heapq.heappop(self._timers)
+                try:
+                    cb()
+                except Exception as e:
+                    print(f"Scheduled callback failed: {e}")
+            for key, fn in list(self._tickers.items()):
+                try:
+                    interval = fn(now)
+                except Exception as e:
+                    print(f"Ticker {key} failed: {e}")
+                    continue
+                if interval is not None:
+                    wants = min(wants, interval)
+        finally:
+            self._reschedule(self.clock(), max(self.MIN_INTERVAL, wants))
+
+#--- Theme registry ---
+# Classic Tk widgets are recorded once, when their screen is built, together with
+# which palette key each colour option came from. Switching theme then only
+# reconfigures the options whose palette value actually changed, in one pass;
+# ttk widgets follow their styles. Hover handlers are bound once at registration
+# and read the live palette, so they never need re-binding.
+class ThemeRegistry:
+    WIDGET_OPTIONS = {
+        'Frame': ('bg',),
+        'Toplevel': ('bg',),
+        'Canvas': ('bg',),
+        'Label': ('bg', 'fg'),
+        'Button': ('bg', 'fg', 'activebackground', 'activeforeground'),
+        'Entry': ('bg', 'fg', 'insertbackground'),
+        'Spinbox': ('bg', 'fg', 'insertbackground', 'buttonbackground'),
+        'Listbox': ('bg', 'fg', 'selectbackground'),
+    }
+
+    def __init__(self, palette, themes=THEMES, on_switch=None):
+        self.palette = palette   # the app's live colour dict, updated in place
+        self.themes = themes
+        self.on_switch = on_switch
+        self._widgets = {}       # widget path -> (widget, {option: palette key})
+        self._prune_at = 1024
+
+    def __len__(self):
+        return len(self._widgets)
+
+    def register(self, widget, **roles):
+        path = str(widget)
+        if path in self._widgets:
+            return widget
+        self._widgets[path] = (widget, roles)
+        if widget.winfo_class() == 'Button' and roles.get('bg') == 'ACCENT':
+            widget.config(activebackground=self.palette['ACCENT_HOVER'], relief='flat', bd=0, highlightthickness=0)
+            roles['activebackground'] = 'ACCENT_HOVER'
+            widget.bind('<Enter>', self._hover_in, add='+')
+            widget.bind('<Leave>', self._hover_out, add='+')
+        return widget
+
+    def _hover_in(self, e):
+        e.widget.config(bg=self.palette['ACCENT_HOVER'])
+
+    def _hover_out(self, e):
+        e.widget.config(bg=self.palette['ACCENT'])
+
+    def adopt(self, root):
+        # record every not-yet-known classic widget under root, inferring each
+        # option's palette key from its current colour
+        lookup = {v.lower(): k for k, v in self.palette.items()}
+        stack = [root]
+        while stack:
+            w = stack.pop()
+            stack.extend(w.winfo_children())
+            if str(w) in self._widgets:
+                continue
+            opts = self.WIDGET_OPTIONS.get(w.winfo_class())
+            if not opts:
+                continue
+            roles = {}
+            for opt in opts:
+                try:
+                    key = lookup.get(str(w.cget(opt)).lower())
+                except TclError:
+                    continue
+                if key:
+                    roles[opt] = key
+            if roles:
+                self.register(w, **roles)
+        if len(self._widgets) > self._prune_at:
+            self._prune()
+
+    def _prune(self):
+        for path, (w, _) in list(self._widgets.items()):
+            try:
+                if not w.winfo_exists():
+                    del self._widgets[path]
+            except TclError:
+                del self._widgets[path]
+        self._prune_at = max(1024, 2 * len(self._widgets))
+
+    def switch(self, name):
+        new = self.themes[name]
+        changed = {k for k, v in new.items() if self.palette.get(k) != v}
+        self.palette.update(new)
+        if changed:
+            dead = []
+            for path, (w, roles) in self._widgets.items():
+                opts = {opt: new[key] for opt, key in roles.items() if key in changed}
+                if not opts:
+                    continue
+                try:
+                    w.configure(**opts)
+                except TclError:
+                    dead.append(path)
+            for path in dead:
+                del self._widgets[path]
+        if self.on_switch:
+            self.on_switch(self.palette)
+        return len(changed)
+
+def benchmark_theme_switch(n=5000, rounds=5):
+    # compares a registry switch against the old walk-every-widget approach
+    root = Tk()
+    root.withdraw()
+    palette = dict(THEMES['dark'])
+    host = Frame(root, bg=palette['MAIN_BG'])
+    for i in range(n):
+        kind = i % 3
+        if kind == 0:
+            Label(host, text=str(i), bg=palette['MAIN_BG'], fg=palette['TEXT_LIGHT'])
+        elif kind == 1:
+            Button(host, text=str(i), bg=palette['ACCENT'], fg=palette['TEXT_LIGHT'])
+        else:
+            Frame(host, bg=palette['CARD_BG'])
+    reg = ThemeRegistry(palette)
+    t0 = time.perf_counter()
+    reg.adopt(host)
+    adopt_ms = (time.perf_counter() - t0) * 1000
+
+    def timed(fn):
+        best = float('inf')
+        for r in range(rounds):
+            t = time.perf_counter()
+            fn('light' if r % 2 == 0 else 'dark')
+            root.update_idletasks()
+            best = min(best, (time.perf_counter() - t) * 1000)
+        return best
+
+    def legacy(name):
+        t = THEMES[name]
+        stack = [host]
+        while stack:
+            w = stack.pop()
+            stack.extend(w.winfo_children())
+            try:
+                if isinstance(w, Button):
+                    w.config(bg=t['ACCENT'], fg=t['TEXT_LIGHT'], activebackground=t['ACCENT_HOVER'], relief='flat', bd=0, highlightthickness=0)
+                    w.bind("<Enter>", lambda e, c=t["ACCENT_HOVER"]: e.widget.config(bg=c))
+                    w.bind("<Leave>", lambda e, c=t["ACCENT"]: e.widget.config(bg=c))
+                elif isinstance(w, Label):
+                    w.config(bg=t['MAIN_BG'], fg=t['TEXT_LIGHT'])
+                elif isinstance(w, Frame):
+                    w.config(bg=t['MAIN_BG'])
+            except Exception:
+                pass
+
+    result = {'widgets': n, 'adopt_ms': round(adopt_ms, 2),
+              'registry_switch_ms': round(timed(reg.switch), 2),
+              'recursive_walk_ms': round(timed(legacy), 2)}
+    root.destroy()
+    return result
+
+#--- Virtual list ---
+# A Listbox that only ever holds the rows in view. `count()` gives the size of
+# the current result set and `fetch(start, k)` the names in rows start..start+k;
+# scrolling moves a window over them and rewrites only the lines that changed,
+# so the widget costs the same for ten names or ten thousand.
+class VirtualList:
+    def __init__(self, parent, fetch, count, rows=15, on_select=None, **listbox_opts):
+        self.fetch, self.count, self.rows, self.on_select = fetch, count, rows, on_select
+        self.offset = 0
+        self.total = 0
+        self.selected = None
+        self._lines = []
+        self.frame = Frame(parent, bg=listbox_opts.get('bg'))
+        self.listbox = Listbox(self.frame, height=rows, exportselection=False, **listbox_opts)
+        self.scroll = ttk.Scrollbar(self.frame, orient='vertical', command=self.yview)
+        self.scroll.pack(side='right', fill='y')
+        self.listbox.pack(side='left', fill='both', expand=True)
+        self.listbox.bind('<<ListboxSelect>>', self._selected)
+        self.listbox.bind('<MouseWheel>', lambda e: self._wheel(-1 if e.delta > 0 else 1))
+        self.listbox.bind('<Button-4>', lambda e: self._wheel(-1))
+        self.listbox.bind('<Button-5>', lambda e: self._wheel(1))
+
+    def pack(self, **kw):
+        self.frame.pack(**kw)
+
+    def yview(self, *args):
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.total))
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (self.rows if args[2] == 'pages' else 1)
+            self.scroll_to(self.offset + step)
+
+    def _wheel(self, step):
+        self.scroll_to(self.offset + 3 * step)
+        return 'break'
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(offset, self.total - self.rows))
+        self.refresh(recount=False)
+
+    def refresh(self, recount=True):
+        if recount:
+            self.total = self.count()
+            self.offset = max(0, min(self.offset, self.total - self.rows))
+        lines = self.fetch(self.offset, self.rows)
+        lb = self.listbox
+        old = self._lines
+        # a small scroll shifts the window: drop rows at one edge, add at the other
+        d = next((d for d in range(1, min(len(old), len(lines))) if lines[:len(old) - d] == old[d:]), 0)
+        if d:
+            lb.delete(0, d - 1)
+            self._lines = old[d:]
+        else:
+            d = next((d for d in range(1, min(len(old), len(lines))) if lines[d:] == old[:len(lines) - d]), 0)
+            if d:
+                lb.delete(len(lines) - d, 'end')
+                for text in reversed(lines[:d]):
+                    lb.insert(0, text)
+                self._lines = lines[:d] + old[:len(lines) - d]
+        for i, text in enumerate(lines):
+            if i >= len(self._lines):
+                lb.insert('end', text)
+            elif self._lines[i] != text:
+                lb.delete(i)
+                lb.insert(i, text)
+        if len(self._lines) > len(lines):
+            lb.delete(len(lines), 'end')
+        self._lines = lines
+        lb.selection_clear(0, 'end')
+        if self.selected in lines:
+            lb.selection_set(lines.index(self.selected))
+        if self.total:
+            self.scroll.set(self.offset / self.total, min(1.0, (self.offset + self.rows) / self.total))
+        else:
+            self.scroll.set(0, 1)
+
+    def _selected(self, event):
+        sel = self.listbox.curselection()
+        if not sel:
+            return
+        self.selected = self._lines[sel[0]]
+        if self.on_select:
+            self.on_select(self.selected)
+
+    def show(self, name, position):
+        # select `name`, scrolling so its row (`position` in the result set) is in view
+        self.selected = name
+        if not self.offset <= position < self.offset + self.rows:
+            self.offset = position - self.rows // 2
+        self.refresh()
+
 #--- App class ---
 class EnhancedMathsQuizApp(Tk):
     def __init__(self):
@@ -105,194 +2244,156 @@ class EnhancedMathsQuizApp(Tk):
         #-------------------------
         #--- Theme / Styling -----
         #-------------------------
-        self._THEME = {}
-        PRIMARY_BG = "#0b1220"
-        MAIN_BG = "#071025"
-        SIDEBAR_BG = "#0f1724"
-        CARD_BG = "#1e293b" # Updated to be slightly lighter for contrast
-        TEXT_LIGHT = "#e6eef8"
-        ACCENT = "#2b8ef6"
-        ACCENT_HOVER = "#60a5fa"
-        ENTRY_BG = "#071829"
-        MUTED = "#93a4b8"
-        
-        # Added for Feedback
-        SUCCESS = "#22c55e"
-        ERROR = "#ef4444"
-
-        self._THEME.update({
-            "PRIMARY_BG": PRIMARY_BG,
-            "MAIN_BG": MAIN_BG,
-            "SIDEBAR_BG": SIDEBAR_BG,
-            "CARD_BG": CARD_BG,
-            "TEXT_LIGHT": TEXT_LIGHT,
-            "ACCENT": ACCENT,
-            "ACCENT_HOVER": ACCENT_HOVER,
-            "ENTRY_BG": ENTRY_BG,
-            "MUTED": MUTED,
-            "SUCCESS": SUCCESS,
-            "ERROR": ERROR
-        })
-
-        # --- STYLE UPDATES (Bigger Fonts) ---
+        self._THEME = dict(THEMES["dark"])
+        self.theme = ThemeRegistry(self._THEME, on_switch=lambda t: self._on_theme_switch())
+        self._configure_styles()
+
+        # -------------------------
+        # state
+        # -------------------------
+        self.current_profile = None
+        self.difficulty = 'Moderate'
+        self.ops = '+-'
+        self.timer_seconds = 15
+        self.timer_remaining = 0
+        self.question_deadline = None
+        self.feedback_handle = None
+        self.scheduler = FrameScheduler(self)
+        self.engine = QuizEngine(self.difficulty, self.timer_seconds)
+        self._dirty = set()  # screens whose data changed while hidden
+        
+        # New state for UI flow (prevents double clicking while flashing)
+        self.is_processing_answer = False
+        self.net = None  # ClassClient while playing a class quiz
+        self._connecting = None  # pending join_class_quiz connection
+
+        # theme state
+        self.dark_mode = True
+        self.bg_image = None
+
+        # UI layout
+        self.sidebar = Frame(self, width=240, bg=self._THEME["SIDEBAR_BG"])
+        self.sidebar.pack(side='left', fill='y')
+        self.main_area = Frame(self, bg=self._THEME["MAIN_BG"])
+        self.main_area.pack(side='right', fill='both', expand=True)
+
+        # build UI: the sidebar and home now, every other screen on first visit
+        self._build_sidebar()
+        self._build_main_frames()
+
+        self.theme.adopt(self)
+
+        # start on home
+        self.show_frame('home')
+
+        # leaderboard and profile index load off the UI thread
+        self.data_loaded_at = None
+        self._data_ready = threading.Event()
+        threading.Thread(target=self._load_data, daemon=True).start()
+        self.scheduler.add_ticker('startup', self._poll_startup)
+
+        self.protocol('WM_DELETE_WINDOW', self._on_close)
+        self.after(500, self._poll_persistence_errors)
+
+    # ---------- Persistence ----------
+    def _poll_persistence_errors(self):
+        failed = []
+        try:
+            while True:
+                failed.append(persistence.errors.get_nowait())
+        except queue.Empty:
+            pass
+        if failed:
+            more = f"\n(+{len(failed) - 5} more)" if len(failed) > 5 else ""
+            messagebox.showerror('Save failed', 'Some data could not be saved:\n\n' + '\n'.join(failed[:5]) + more)
+        self.after(500, self._poll_persistence_errors)
+
+    def _on_close(self):
+        if not persistence.flush(timeout=5):
+            if not messagebox.askyesno('Saving', 'Data is still being written to disk. Quit anyway?'):
+                return
+        if self.net:
+            self.net.close()
+        self.destroy()
+
+    # --- STYLE UPDATES (Bigger Fonts) ---
+    def _on_theme_switch(self):
+        self._configure_styles()
+        if 'profiles' in self._built:
+            self._draw_chart()   # canvas items are not tracked by the registry
+
+    def _configure_styles(self):
+        # ttk widgets are themed here, once per style, rather than per widget
+        t = self._THEME
         try:
             style = ttk.Style(self)
-            style.theme_use("clam")
+            if style.theme_use() != "clam":
+                style.theme_use("clam")
             
             style.configure("TButton",
                             font=(MAIN_FONT, 12, "bold"),
                             padding=10,
-                            foreground=TEXT_LIGHT,
-                            background=ACCENT,
+                            foreground=t["TEXT_LIGHT"],
+                            background=t["ACCENT"],
                             borderwidth=0)
             style.map("TButton",
-                      background=[("active", ACCENT_HOVER), ("!active", ACCENT)])
+                      background=[("active", t["ACCENT_HOVER"]), ("!active", t["ACCENT"])])
             
             style.configure("TLabel",
-                            background=MAIN_BG,
-                            foreground=TEXT_LIGHT,
+                            background=t["MAIN_BG"],
+                            foreground=t["TEXT_LIGHT"],
                             font=(MAIN_FONT, 14))
             
-            style.configure("TFrame", background=MAIN_BG)
+            style.configure("TFrame", background=t["MAIN_BG"])
             
             style.configure("TCombobox",
-                            fieldbackground=ENTRY_BG,
-                            background=ENTRY_BG,
-                            foreground=TEXT_LIGHT,
+                            fieldbackground=t["ENTRY_BG"],
+                            background=t["ENTRY_BG"],
+                            foreground=t["TEXT_LIGHT"],
                             arrowsize=20,
                             padding=5)
             
             style.configure("Treeview",
-                            background=ENTRY_BG,
-                            foreground=TEXT_LIGHT,
-                            fieldbackground=ENTRY_BG,
+                            background=t["ENTRY_BG"],
+                            foreground=t["TEXT_LIGHT"],
+                            fieldbackground=t["ENTRY_BG"],
                             font=(MAIN_FONT, 12),
                             rowheight=40)
             
             style.configure("Treeview.Heading",
-                            background=ACCENT,
+                            background=t["ACCENT"],
                             foreground="white",
                             font=(MAIN_FONT, 13, "bold"),
                             padding=10)
             
             # New Progress Bar Style
             style.configure("Horizontal.TProgressbar",
-                            background=ACCENT,
-                            troughcolor=ENTRY_BG,
-                            bordercolor=ENTRY_BG,
-                            lightcolor=ACCENT,
-                            darkcolor=ACCENT)
+                            background=t["ACCENT"],
+                            troughcolor=t["ENTRY_BG"],
+                            bordercolor=t["ENTRY_BG"],
+                            lightcolor=t["ACCENT"],
+                            darkcolor=t["ACCENT"])
                             
         except Exception:
             pass
 
-        # Root-level defaults
+        # Root-level defaults (re-added on every switch so new widgets match)
         try:
-            self.option_add("*Background", MAIN_BG)
-            self.option_add("*Foreground", TEXT_LIGHT)
+            self.option_add("*Background", t["MAIN_BG"])
+            self.option_add("*Foreground", t["TEXT_LIGHT"])
             self.option_add("*Label.Font", (MAIN_FONT, 14))
             self.option_add("*Button.Font", (MAIN_FONT, 12, "bold"))
             self.option_add("*Entry.Font", (MAIN_FONT, 14))
             self.option_add("*Listbox.Font", (MAIN_FONT, 14))
-            self.option_add("*Button.Background", ACCENT)
-            self.option_add("*Button.Foreground", TEXT_LIGHT)
+            self.option_add("*Button.Background", t["ACCENT"])
+            self.option_add("*Button.Foreground", t["TEXT_LIGHT"])
             self.option_add("*TearOff", False)
         except Exception:
             pass
 
-        # -------------------------
-        # state
-        # -------------------------
-        self.current_profile = None
-        self.score = 0
-        self.question_index = 0
-        self.difficulty = 'Moderate'
-        self.first_attempt = True
-        self.current_problem = None
-        self.timer_seconds = 15
-        self.timer_remaining = 0
-        self.timer_after_id = None
-        self.quiz_start_time = None
-        self.questions_attempted = []
-        
-        # New state for UI flow (prevents double clicking while flashing)
-        self.is_processing_answer = False
-
-        # theme state
-        self.dark_mode = True
-        self.bg_image = None
-
-        # UI layout
-        self.sidebar = Frame(self, width=240, bg=SIDEBAR_BG)
-        self.sidebar.pack(side='left', fill='y')
-        self.main_area = Frame(self, bg=MAIN_BG)
-        self.main_area.pack(side='right', fill='both', expand=True)
-
-        # build UI
-        self._build_sidebar()
-        self._build_main_frames()
-
-        try:
-            self._apply_theme_recursive(self)
-        except Exception:
-            pass
-
-        # start on home
-        self.show_frame('home')
-
-    # (KEPT ORIGINAL)
-    def _apply_theme_recursive(self, w):
-        t = self._THEME
-        for child in w.winfo_children():
-            try:
-                cls = child.winfo_class()
-                if isinstance(child, Frame):
-                    if child is self.sidebar:
-                        child.config(bg=t["SIDEBAR_BG"])
-                    elif child is self.main_area:
-                        child.config(bg=t["MAIN_BG"])
-                    else:
-                        # We skip coloring Frames manually if they are the new "Card" frames
-                        # to avoid overriding the card color logic
-                        pass
-
-                if isinstance(child, Label):
-                    try:
-                        # Skip card labels so they can flash colors
-                        if "Card" not in str(child): 
-                            child.config(bg=t["MAIN_BG"], fg=t["TEXT_LIGHT"])
-                    except Exception:
-                        pass
-
-                if isinstance(child, Button):
-                    try:
-                        child.config(bg=t["ACCENT"], fg=t["TEXT_LIGHT"], activebackground=t["ACCENT_HOVER"],
-                                     relief='flat', bd=0, highlightthickness=0)
-                        child.bind("<Enter>", lambda e, c=t["ACCENT_HOVER"]: e.widget.config(bg=c))
-                        child.bind("<Leave>", lambda e, c=t["ACCENT"]: e.widget.config(bg=c))
-                    except Exception:
-                        pass
-
-                if isinstance(child, Entry):
-                    try:
-                        child.config(bg=t["ENTRY_BG"], fg=t["TEXT_LIGHT"], insertbackground=t["TEXT_LIGHT"],
-                                     relief='flat', bd=0)
-                    except Exception:
-                        pass
-
-                if isinstance(child, Listbox):
-                    try:
-                        child.config(bg=t["ENTRY_BG"], fg=t["TEXT_LIGHT"], bd=0, highlightthickness=0)
-                    except Exception:
-                        pass
-                
-                self._apply_theme_recursive(child)
-            except Exception:
-                pass
-
     # ---------- UI: Sidebar ----------
     def _build_sidebar(self):
-        logo = Label(self.sidebar, text='MathsQuiz', font=(MAIN_FONT, 28, 'bold'), bg='#0f1724', fg='#e6eef8')
+        logo = Label(self.sidebar, text='MathsQuiz', font=(MAIN_FONT, 28, 'bold'), bg=self._THEME["SIDEBAR_BG"], fg=self._THEME["TEXT_LIGHT"])
         logo.pack(fill='x', pady=(25, 20), padx=15)
 
         buttons = [
@@ -301,10 +2402,11 @@ class EnhancedMathsQuizApp(Tk):
             ('New Quiz', 'quiz_setup'),
             ('Profiles', 'profiles'),
             ('Leaderboard', 'leaderboard'),
+            ('Statistics', 'stats'),
             ('Settings', 'settings')
         ]
         
-        Frame(self.sidebar, bg='#0f1724', height=20).pack()
+        Frame(self.sidebar, bg=self._THEME["SIDEBAR_BG"], height=20).pack()
 
         for text, frame_key in buttons:
             b = Button(self.sidebar, text=text, font=(MAIN_FONT, 14), relief='flat',
@@ -318,20 +2420,63 @@ class EnhancedMathsQuizApp(Tk):
     # ---------- UI: Main frames ----------
     def _build_main_frames(self):
         self.frames = {}
-        keys = ['home', 'instructions', 'quiz_setup', 'quiz', 'results', 'leaderboard', 'profiles', 'settings']
+        keys = ['home', 'instructions', 'quiz_setup', 'quiz', 'results', 'leaderboard', 'profiles', 'stats', 'settings']
         for key in keys:
             frame = Frame(self.main_area, bg=self._THEME["MAIN_BG"])
             self.frames[key] = frame
             frame.place(relx=0, rely=0, relwidth=1, relheight=1)
 
-        self._populate_home()
-        self._populate_instructions()
-        self._populate_quiz_setup()
-        self._populate_quiz()
-        self._populate_results()
-        self._populate_leaderboard()
-        self._populate_profiles()
-        self._populate_settings()
+        self.current_frame = None
+        self._built = set()
+        self._builders = {
+            'home': self._populate_home,
+            'instructions': self._populate_instructions,
+            'quiz_setup': self._populate_quiz_setup,
+            'quiz': self._populate_quiz,
+            'results': self._populate_results,
+            'leaderboard': self._populate_leaderboard,
+            'profiles': self._populate_profiles,
+            'stats': self._populate_stats,
+            'settings': self._populate_settings,
+        }
+        # screens are built once; these bring a dirty one up to date on show
+        self._refreshers = {
+            'quiz_setup': self._refresh_profile_select,
+            'leaderboard': self._refresh_leaderboard,
+            'profiles': self._refresh_profiles,
+            'stats': self._refresh_stats,
+        }
+
+    def _mark_dirty(self, *keys):
+        self._dirty.update(keys)
+
+    def _ensure_frame(self, key):
+        if key in self._built:
+            return
+        self._built.add(key)
+        self._dirty.discard(key)  # built from current data
+        self._builders[key]()
+        self.theme.adopt(self.frames[key])
+
+    def _load_data(self):
+        try:
+            profiles.keys()
+            leaderboard_log.ensure_loaded()
+            global_stats.ensure_loaded()
+        finally:
+            self._data_ready.set()
+
+    def _poll_startup(self, now):
+        if not self._data_ready.is_set():
+            return 0.05
+        self.scheduler.remove_ticker('startup')
+        self.data_loaded_at = time.perf_counter()
+        self._mark_dirty('quiz_setup', 'leaderboard', 'profiles', 'stats')
+        key = self.current_frame
+        if key in self._dirty and key in self._built:
+            self._dirty.discard(key)
+            self._refreshers[key]()
+        return None
 
     def show_frame(self, key):
         if key not in self.frames:
@@ -339,13 +2484,14 @@ class EnhancedMathsQuizApp(Tk):
         
         # Fix for timer running in background
         if key != 'quiz':
-            if self.timer_after_id:
-                try:
-                    self.after_cancel(self.timer_after_id)
-                except Exception:
-                    pass
-                self.timer_after_id = None
+            self.scheduler.remove_ticker('countdown')
+
+        self._ensure_frame(key)
+        if key in self._dirty:
+            self._dirty.discard(key)
+            self._refreshers[key]()
 
+        self.current_frame = key
         self.frames[key].lift()
         self.profile_label.config(text=f'User: {self.current_profile}' if self.current_profile else 'No profile')
 
@@ -380,7 +2526,7 @@ class EnhancedMathsQuizApp(Tk):
             "1. Select a profile (optional) or create new.\n\n"
             "2. Choose a difficulty level (Easy / Moderate / Advanced / Extreme).\n\n"
             "3. Each quiz contains 10 questions.\n\n"
-            "4. Only addition and subtraction questions will appear.\n\n"
+            "4. Pick the operations: +/-, ×, ÷ (always whole answers) or mixed.\n\n"
             "5. You have limited time per question; answer before timer ends.\n\n"
             "6. Correct on first try: +10 points. Correct on second try: +5 points.\n\n"
             "7. Screen will flash GREEN for correct, RED for incorrect.\n"
@@ -405,14 +2551,10 @@ class EnhancedMathsQuizApp(Tk):
         
         Label(pf, text='Profile:', font=(MAIN_FONT, 16), bg=self._THEME["MAIN_BG"], fg=self._THEME["TEXT_LIGHT"]).grid(row=0, column=0, sticky='e', padx=10, pady=10)
         
-        profiles_list = list(profiles.keys())
-        self.profile_select = ttk.Combobox(pf, values=profiles_list if profiles_list else ['Anonymous'], state='normal', font=(MAIN_FONT, 14), width=20)
+        # the dropdown lists only names matching what has been typed so far
+        self.profile_select = ttk.Combobox(pf, state='normal', font=(MAIN_FONT, 14), width=20, postcommand=self._filter_profile_select)
         self.profile_select.grid(row=0, column=1, padx=10, pady=10)
-        
-        if profiles_list:
-            self.profile_select.set(profiles_list[0])
-        elif self.current_profile:
-             self.profile_select.set(self.current_profile)
+        self._refresh_profile_select()
 
         Button(pf, text='Manage', font=(MAIN_FONT, 10), bg=self._THEME["ACCENT"], fg=self._THEME["TEXT_LIGHT"], command=lambda: self.show_frame('profiles')).grid(row=0, column=2, padx=10)
 
@@ -421,40 +2563,54 @@ class EnhancedMathsQuizApp(Tk):
         self.difficulty_combo.set(self.difficulty)
         self.difficulty_combo.grid(row=1, column=1, padx=10, pady=10)
 
-        Label(pf, text='Time per question (s):', font=(MAIN_FONT, 16), bg=self._THEME["MAIN_BG"], fg=self._THEME["TEXT_LIGHT"]).grid(row=2, column=0, sticky='e', padx=10, pady=10)
+        Label(pf, text='Operations:', font=(MAIN_FONT, 16), bg=self._THEME["MAIN_BG"], fg=self._THEME["TEXT_LIGHT"]).grid(row=2, column=0, sticky='e', padx=10, pady=10)
+        self.ops_combo = ttk.Combobox(pf, values=list(OPERATIONS.keys()), state='readonly', font=(MAIN_FONT, 14), width=20)
+        self.ops_combo.set(next((k for k, v in OPERATIONS.items() if v == self.ops), 'Addition & Subtraction'))
+        self.ops_combo.grid(row=2, column=1, padx=10, pady=10)
+
+        Label(pf, text='Time per question (s):', font=(MAIN_FONT, 16), bg=self._THEME["MAIN_BG"], fg=self._THEME["TEXT_LIGHT"]).grid(row=3, column=0, sticky='e', padx=10, pady=10)
         self.time_spin = Spinbox(pf, from_=5, to=60, width=5, font=(MAIN_FONT, 14))
         self.time_spin.delete(0, 'end')
         self.time_spin.insert(0, str(self.timer_seconds))
-        self.time_spin.grid(row=2, column=1, sticky='w', padx=10, pady=10)
+        self.time_spin.grid(row=3, column=1, sticky='w', padx=10, pady=10)
 
-        Button(container, text='Begin Quiz', width=20, font=(MAIN_FONT, 16, 'bold'), bg=self._THEME["ACCENT"], fg=self._THEME["TEXT_LIGHT"], command=self.begin_quiz).pack(pady=40)
+        Button(container, text='Begin Quiz', width=20, font=(MAIN_FONT, 16, 'bold'), bg=self._THEME["ACCENT"], fg=self._THEME["TEXT_LIGHT"], command=self.begin_quiz).pack(pady=(40, 10))
+        Button(container, text='Join Class Quiz', width=20, font=(MAIN_FONT, 12), bg=self._THEME["ACCENT"], fg=self._THEME["TEXT_LIGHT"], command=self.join_class_quiz).pack()
 
-    def begin_quiz(self):
+    def begin_quiz(self, replay=None):
+        self._ensure_frame('quiz_setup')  # replays start from the leaderboard
         sel = self.profile_select.get().strip()
         
         if sel and sel in profiles:
             self.current_profile = sel
+            profiles.get(sel)  # read the shard now rather than on the results screen
         else:
             if sel and sel != 'Anonymous':
                 if sel not in profiles:
                     profiles[sel] = self._default_profile(sel)
-                    save_json_file(PROFILES_FILE, profiles)
-                    self._refresh_profile_widgets() 
+                    self._mark_dirty('quiz_setup', 'profiles')
                 self.current_profile = sel
             else:
                 self.current_profile = None
 
         self.difficulty = self.difficulty_combo.get() or self.difficulty
+        self.ops = OPERATIONS.get(self.ops_combo.get(), self.ops)
         try:
             self.timer_seconds = int(self.time_spin.get())
         except Exception:
             self.timer_seconds = 15
 
-        self.score = 0
-        self.question_index = 0
-        self.questions_attempted = []
-        self.quiz_start_time = time.time()
+        seed = None
+        if replay:
+            # same seed, difficulty and operations -> the same ten questions
+            self.difficulty = replay.get('difficulty', self.difficulty)
+            self.ops = replay.get('ops', '+-')
+            seed = replay['seed']
+        self._leave_class()  # a local quiz after a class round must not answer to the server
+        self.engine = QuizEngine(self.difficulty, self.timer_seconds, ops=self.ops, seed=seed)
+        self.engine.start()
         self.show_frame('quiz')
+        self.class_label.config(text='')
         self._start_question()
 
     # ---------- Quiz screen (VISUAL UPGRADE) ----------
@@ -473,6 +2629,10 @@ class EnhancedMathsQuizApp(Tk):
         self.score_label = Label(top, text='Score: 0', font=(MAIN_FONT, 16, 'bold'), bg=self._THEME["MAIN_BG"], fg=self._THEME["SUCCESS"])
         self.score_label.pack(side='right')
 
+        # live class standings, only filled in during a class quiz
+        self.class_label = Label(top, text='', font=(MAIN_FONT, 12), bg=self._THEME["MAIN_BG"], fg=self._THEME["MUTED"])
+        self.class_label.pack(side='left', expand=True)
+
         # --- CARD CONTAINER ---
         self.card = Frame(f, bg=self._THEME["CARD_BG"], bd=2, relief="flat")
         self.card.pack(expand=True, fill='both', padx=50, pady=20)
@@ -507,33 +2667,17 @@ class EnhancedMathsQuizApp(Tk):
         self.time_progress = ttk.Progressbar(bottom, orient='horizontal', mode='determinate', style="Horizontal.TProgressbar")
         self.time_progress.pack(fill='x', pady=5)
 
-    def _random_numbers(self):
-        min_v, max_v = DIFFICULTY.get(self.difficulty, (1, 99))
-        return random.randint(min_v, max_v), random.randint(min_v, max_v)
-
     def _start_question(self):
-        if self.timer_after_id:
-            try:
-                self.after_cancel(self.timer_after_id)
-            except Exception:
-                pass
-            self.timer_after_id = None
+        self.scheduler.remove_ticker('countdown')
 
-        if self.question_index >= QUESTIONS_PER_QUIZ:
+        if self.engine.finished:
             self._end_quiz()
             return
 
         self.is_processing_answer = False
-        n1, n2 = self._random_numbers()
-        op = random.choice(['+', '-'])
-        if op == '-' and n1 < n2:
-            n1, n2 = n2, n1
+        n1, n2, op = self.engine.current_problem
 
-        self.current_problem = (n1, n2, op)
-        self.first_attempt = True
-
-        if not hasattr(self, 'answer_entry') or not self.answer_entry.winfo_exists():
-            self._populate_quiz()
+        self._ensure_frame('quiz')
 
         # Reset Visuals for next question
         self.card.config(bg=self._THEME["CARD_BG"])
@@ -543,33 +2687,32 @@ class EnhancedMathsQuizApp(Tk):
         self.answer_entry.config(state='normal')
         self.answer_entry.focus_set()
 
-        self.progress_label.config(text=f"Question {self.question_index+1} / {QUESTIONS_PER_QUIZ}")
-        self.score_label.config(text=f"Score: {self.score}")
+        self.progress_label.config(text=f"Question {self.engine.question_index+1} / {self.engine.questions}")
+        self.score_label.config(text=f"Score: {self.engine.score}")
         
         # Reset Timer Bar
         self.timer_remaining = self.timer_seconds
         self.time_progress['maximum'] = self.timer_seconds * 10 
         self.time_progress['value'] = self.timer_seconds * 10
         
-        self._tick_timer()
+        self.question_deadline = self.scheduler.clock() + self.timer_seconds
+        self.scheduler.add_ticker('countdown', self._tick_timer)
 
-    def _tick_timer(self):
-        # Update Bar
+    def _tick_timer(self, now):
+        # Remaining time always comes from the deadline, so late frames never drift
+        self.timer_remaining = max(0.0, self.question_deadline - now)
         self.time_progress['value'] = self.timer_remaining * 10
         
         if self.timer_remaining <= 0:
+            self.scheduler.remove_ticker('countdown')
             self._handle_feedback(False, "TIME UP!", is_timeout=True)
-            return
-        
-        # Update every 0.1s for smoothness
-        self.timer_remaining -= 0.1
-        self.timer_after_id = self.after(100, self._tick_timer)
-
-    def _correct_answer(self):
-        if not self.current_problem:
             return None
-        n1, n2, op = self.current_problem
-        return n1 + n2 if op == '+' else n1 - n2
+        
+        # About one bar step (0.5%) per frame, and at least 20 fps for the final 3 s
+        interval = self.timer_seconds / 200
+        if self.timer_remaining < 3:
+            interval = min(interval, 0.05)
+        return min(interval, self.timer_remaining)
 
     def submit_answer(self):
         if self.is_processing_answer: 
@@ -581,35 +2724,34 @@ class EnhancedMathsQuizApp(Tk):
         except Exception:
             self.feedback_label.config(text="Numbers only!", fg=self._THEME["MUTED"])
             return
+        if not answer_in_range(user_ans):
+            self.feedback_label.config(text="That number is too big!", fg=self._THEME["MUTED"])
+            return
 
-        correct = self._correct_answer()
-        time_taken = int(time.time() - self.quiz_start_time) if self.quiz_start_time else 0 
+        if self.net:
+            self.is_processing_answer = True  # until the server acks
+            self._net_send({'type': 'answer', 'q': self.engine.question_index, 'answer': user_ans})
+            return
 
-        if user_ans == correct:
-            points = 10 if self.first_attempt else 5
-            self.score += points
+        correct = self.engine.correct_answer()
+        outcome, _ = self.engine.answer(user_ans)
+
+        if outcome == 'correct':
             play_sound_correct()
-            self._record_attempt(user_ans, time_taken)
             self._handle_feedback(True, "CORRECT!")
         else:
             play_sound_wrong()
-            if self.first_attempt:
-                self.first_attempt = False
+            if outcome == 'retry':
                 # Show red text but don't move on yet
                 self.feedback_label.config(text="Try Again", fg=self._THEME["ERROR"])
                 self.answer_entry.delete(0, 'end')
             else:
-                self._record_attempt(user_ans, time_taken)
                 self._handle_feedback(False, f"WRONG! ({correct})")
 
     # --- NEW FEEDBACK SYSTEM (Replaces messagebox) ---
     def _handle_feedback(self, is_correct, text, is_timeout=False):
         self.is_processing_answer = True
-        
-        if self.timer_after_id:
-            try:
-                self.after_cancel(self.timer_after_id)
-            except: pass
+        self.scheduler.remove_ticker('countdown')
         
         color = self._THEME["SUCCESS"] if is_correct else self._THEME["ERROR"]
         
@@ -620,67 +2762,206 @@ class EnhancedMathsQuizApp(Tk):
         
         if is_timeout:
             play_sound_wrong()
-            self._record_attempt(None, self.timer_seconds)
+        if self.net:
+            return  # the class server decides when the next question starts
+        if is_timeout:
+            self.engine.timeout()
 
         # Wait 1.2 seconds then move to next question
-        self.after(1200, self._next_step)
+        self.feedback_handle = self.scheduler.call_later(1.2, self._next_step)
 
     def _next_step(self):
-        self.question_index += 1
+        self.feedback_handle = None
+        self.engine.advance()
         self._start_question()
 
     def skip_question(self):
         if self.is_processing_answer: return
-        self._record_attempt(user_ans=None, time_taken=0)
+        if self.net:
+            self.is_processing_answer = True
+            self._net_send({'type': 'skip', 'q': self.engine.question_index})
+            return
+        self.engine.skip()
         self._handle_feedback(False, "SKIPPED")
 
-    def _record_attempt(self, user_ans, time_taken):
-        if not self.current_problem:
+    # ---------- Class quiz ----------
+    def join_class_quiz(self):
+        addr = simpledialog.askstring('Join Class Quiz', 'Server address (host or host:port):')
+        if not addr:
             return
-        n1, n2, op = self.current_problem
-        correct = self._correct_answer()
-        correct_bool = (user_ans == correct)
-        qstr = f"{n1} {op} {n2}"
-        self.questions_attempted.append((qstr, user_ans, correct, correct_bool, time_taken))
+        host, _, port = addr.strip().partition(':')
+        try:
+            port = int(port) if port else CLASS_PORT
+        except ValueError:
+            messagebox.showerror('Class Quiz', f'Bad port in {addr}')
+            return
+        name = self.profile_select.get().strip()
+        self._leave_class()  # one class connection at a time
+
+        # connecting can block for seconds, so it runs off the Tk thread; a
+        # cancelled attempt closes its own socket when it finishes
+        pending = {'lock': threading.Lock(), 'done': False, 'cancelled': False, 'client': None, 'error': None,
+                   'addr': addr, 'name': name if name and name != 'Anonymous' else 'Guest'}
+        def connect():
+            client = error = None
+            try:
+                client = ClassClient(host, port)
+            except OSError as e:
+                error = e
+            with pending['lock']:
+                if pending['cancelled']:
+                    if client:
+                        client.close()
+                    return
+                pending.update(client=client, error=error, done=True)
+        self._connecting = pending
+        threading.Thread(target=connect, daemon=True).start()
+        self.scheduler.add_ticker('net', self._poll_connect)
+
+    def _poll_connect(self, now):
+        pending = self._connecting
+        if pending is None or not pending['done']:
+            return 0.1
+        self._connecting = None
+        self.scheduler.remove_ticker('net')
+        if pending['error'] is not None:
+            messagebox.showerror('Class Quiz', f"Could not connect to {pending['addr']}: {pending['error']}")
+            return None
+        self.net = pending['client']
+        self._net_send({'type': 'join', 'name': pending['name']})
+        if not self.net:
+            return None
+        self.engine = QuizEngine()  # no problems until the server starts a round
+        self.scheduler.add_ticker('net', self._poll_net)
+        self.show_frame('quiz')
+        self.question_label.config(text='Waiting…')
+        self.feedback_label.config(text='Waiting for the class to start', bg=self._THEME["CARD_BG"], fg=self._THEME["MUTED"])
+        self.class_label.config(text='')
+        return None
+
+    def _net_send(self, msg):
+        try:
+            self.net.send(msg)
+        except OSError:
+            self._leave_class('Lost connection to the class server.')
+
+    def _leave_class(self, reason=None):
+        self.scheduler.remove_ticker('net')
+        if self._connecting is not None:
+            with self._connecting['lock']:
+                self._connecting['cancelled'] = True
+                if self._connecting['client']:
+                    self._connecting['client'].close()
+            self._connecting = None
+        if self.net:
+            self.net.close()
+            self.net = None
+        if reason:
+            messagebox.showinfo('Class Quiz', reason)
+
+    def _poll_net(self, now):
+        if not self.net:
+            return None
+        for _ in range(50):
+            try:
+                msg = self.net.inbox.get_nowait()
+            except queue.Empty:
+                break
+            self._on_net_message(msg)
+            if not self.net:
+                return None
+        return 0.03
+
+    def _on_net_message(self, msg):
+        kind = msg.get('type')
+        if kind == 'round':
+            self.difficulty, self.ops, self.timer_seconds = msg['difficulty'], msg['ops'], msg['timer']
+            # local copy of the round for display; scoring comes back in the acks
+            self.engine = QuizEngine(msg['difficulty'], msg['timer'], msg['questions'], msg['ops'], msg['seed'])
+            self.engine.start()
+            self.show_frame('quiz')
+        elif kind == 'question' and self.engine.problems:
+            if self.feedback_handle is not None:
+                self.scheduler.cancel(self.feedback_handle)
+                self.feedback_handle = None
+            self.engine.question_index = msg['q']
+            self.engine._next_problem()
+            self._start_question()
+            self.question_deadline = self.scheduler.clock() + msg['remaining']
+        elif kind == 'ack':
+            self.engine.score = msg['score']
+            self.score_label.config(text=f"Score: {self.engine.score}")
+            result = msg['result']
+            if result == 'correct':
+                play_sound_correct()
+                self._handle_feedback(True, "CORRECT!")
+            elif result == 'retry':
+                play_sound_wrong()
+                self.is_processing_answer = False
+                self.feedback_label.config(text="Try Again", fg=self._THEME["ERROR"])
+                self.answer_entry.delete(0, 'end')
+            elif result == 'wrong':
+                play_sound_wrong()
+                self._handle_feedback(False, f"WRONG! ({msg.get('correct')})")
+            elif result == 'timeout':
+                self._handle_feedback(False, "TIME UP!")
+            elif result == 'skipped':
+                self._handle_feedback(False, "SKIPPED")
+            elif result in ('late', 'invalid'):
+                # nothing was scored, so let the player answer again
+                self.is_processing_answer = False
+                self.feedback_label.config(text="Too late!" if result == 'late' else "Numbers only!", fg=self._THEME["MUTED"])
+        elif kind == 'leaderboard':
+            self.class_label.config(text='   '.join(f"{i}. {n} {sc}" for i, (n, sc) in enumerate(msg['rows'][:5], start=1)))
+        elif kind == 'round_end':
+            self.scheduler.remove_ticker('countdown')
+            self.engine.score = msg['score']
+            self._show_results(earned=[], total_time=msg['total_time'], class_rank=(msg['rank'], msg['players']))
+            self.show_frame('results')
+        elif kind == 'bye':
+            self._leave_class()
+        elif kind == 'closed':
+            self._leave_class('The class server closed the connection.')
 
     # ---------- End quiz & results ----------
     def _end_quiz(self):
-        if self.timer_after_id:
-            try:
-                self.after_cancel(self.timer_after_id)
-            except Exception:
-                pass
-            self.timer_after_id = None
+        self.scheduler.remove_ticker('countdown')
 
-        total_time = int(time.time() - self.quiz_start_time) if self.quiz_start_time else 0
-        pct = (self.score / (QUESTIONS_PER_QUIZ * 10)) * 100 if QUESTIONS_PER_QUIZ > 0 else 0
-        
-        num_correct_first_try = sum(1 for q, u, c, b, t in self.questions_attempted if b and (u is not None) and (10 if self.first_attempt else 5) == 10)
-        perfect = all(attempt[3] for attempt in self.questions_attempted) if self.questions_attempted else False
-        
-        earned = self._evaluate_achievements(perfect, total_time, pct)
+        owned = ()
+        if self.current_profile:
+            owned = set(profiles.get(self.current_profile, {}).get('achievements', []))
+        result = self.engine.finish(owned=owned)
+        total_time, earned = result['total_time'], result['earned']
 
-        rec = {'name': self.current_profile or 'Guest', 'score': self.score, 'difficulty': self.difficulty, 'time': time.strftime('%Y-%m-%d %H:%M:%S')}
-        leaderboard.append(rec)
-        leaderboard.sort(key=lambda r: (-r['score'], r['time']))
-        save_json_file(LEADERBOARD_FILE, leaderboard)
+        rec = {'name': self.current_profile or 'Guest', 'score': self.engine.score, 'difficulty': self.difficulty, 'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+               'seed': self.engine.seed, 'ops': self.engine.ops}
+        rank = leaderboard_log.append(rec)
+        diff_rank = leaderboard_log.index.rank(rec, self.difficulty)
 
-        self._populate_leaderboard()
+        global_stats.record(rec['name'], self.difficulty, self.engine.score, self.engine.max_score, total_time, earned)
+        self._mark_dirty('leaderboard', 'stats')
+        try:
+            attempt_log.append(rec['name'], self.difficulty, self.engine.attempts)
+        except (OSError, struct.error) as e:
+            persistence.report(attempt_log.path, e)
 
         if self.current_profile:
             p = profiles.get(self.current_profile, self._default_profile(self.current_profile))
-            p['last_score'] = self.score
-            p['history'].append({'score': self.score, 'time': time.strftime('%Y-%m-%d %H:%M:%S')})
+            p['last_score'] = self.engine.score
+            history_append(p, self.engine.score)
+            progress_charts.invalidate(self.current_profile)
+            latency_record(p, self.difficulty, self.engine.attempts)
             for a in earned:
                 if a not in p['achievements']:
                     p['achievements'].append(a)
             profiles[self.current_profile] = p
-            save_json_file(PROFILES_FILE, profiles)
+            self._mark_dirty('profiles')
 
-        self._populate_results(earned=earned, total_time=total_time)
+        self._show_results(earned=earned, total_time=total_time, rank=(rank, diff_rank))
         self.show_frame('results')
 
-    def _populate_results(self, earned=None, total_time=0):
+    def _populate_results(self):
+        # built once; _show_results fills it in for each finished quiz
         f = self.frames['results']
         for w in f.winfo_children():
             w.destroy()
@@ -689,17 +2970,41 @@ class EnhancedMathsQuizApp(Tk):
         container.pack(expand=True)
 
         Label(container, text='Quiz Complete', font=(MAIN_FONT, 32, 'bold'), bg=self._THEME["MAIN_BG"], fg=self._THEME["TEXT_LIGHT"]).pack(pady=20)
-        Label(container, text=f'Final Score: {self.score} / {QUESTIONS_PER_QUIZ*10}', font=(MAIN_FONT, 24, 'bold'), bg=self._THEME["MAIN_BG"], fg=self._THEME["ACCENT"]).pack(pady=10)
-        Label(container, text=f'Total Time: {total_time} seconds', font=(MAIN_FONT, 16), bg=self._THEME["MAIN_BG"], fg=self._THEME["MUTED"]).pack(pady=10)
-
-        if earned:
-            Label(container, text='Achievements Unlocked!', font=(MAIN_FONT, 18, 'bold'), bg=self._THEME["MAIN_BG"], fg="#fbbf24").pack(pady=(20, 10))
-            for aid in earned:
-                a = next((x for x in ACHIEVEMENTS_DEF if x['id'] == aid), None)
-                if a:
-                    Label(container, text=f"• {a['title']}: {a['desc']}", font=(MAIN_FONT, 14), bg=self._THEME["MAIN_BG"], fg=self._THEME["TEXT_LIGHT"]).pack(anchor='center', pady=2)
+        self.results_score = Label(container, font=(MAIN_FONT, 24, 'bold'), bg=self._THEME["MAIN_BG"], fg=self._THEME["ACCENT"])
+        self.results_score.pack(pady=10)
+        self.results_time = Label(container, font=(MAIN_FONT, 16), bg=self._THEME["MAIN_BG"], fg=self._THEME["MUTED"])
+        self.results_time.pack(pady=10)
+        self.results_rank = Label(container, font=(MAIN_FONT, 16), bg=self._THEME["MAIN_BG"], fg=self._THEME["MUTED"])
+
+        self.results_ach_title = Label(container, text='Achievements Unlocked!', font=(MAIN_FONT, 18, 'bold'), bg=self._THEME["MAIN_BG"], fg="#fbbf24")
+        self.results_ach = [Label(container, font=(MAIN_FONT, 14), bg=self._THEME["MAIN_BG"], fg=self._THEME["TEXT_LIGHT"]) for _ in ACHIEVEMENTS_DEF]
         
-        Button(container, text='Home', width=20, font=(MAIN_FONT, 14), command=lambda: self.show_frame('home')).pack(pady=40)
+        self.results_home = Button(container, text='Home', width=20, font=(MAIN_FONT, 14), command=lambda: self.show_frame('home'))
+        self.results_home.pack(pady=40)
+
+    def _show_results(self, earned=None, total_time=0, rank=None, class_rank=None):
+        self._ensure_frame('results')
+        self.results_score.config(text=f'Final Score: {self.engine.score} / {self.engine.max_score}')
+        self.results_time.config(text=f'Total Time: {total_time} seconds')
+        if rank or class_rank:
+            if rank:
+                overall, in_diff = rank
+                self.results_rank.config(text=f'Leaderboard rank: #{overall} overall, #{in_diff} in {self.difficulty}')
+            else:
+                self.results_rank.config(text=f'Class rank: #{class_rank[0]} of {class_rank[1]}')
+            self.results_rank.pack(pady=10, before=self.results_home)
+        else:
+            self.results_rank.pack_forget()
+
+        self.results_ach_title.pack_forget()
+        for lbl in self.results_ach:
+            lbl.pack_forget()
+        shown = [ACHIEVEMENTS_BY_ID[aid] for aid in earned or () if aid in ACHIEVEMENTS_BY_ID]
+        if shown:
+            self.results_ach_title.pack(pady=(20, 10), before=self.results_home)
+            for lbl, a in zip(self.results_ach, shown):
+                lbl.config(text=f"• {a['title']}: {a['desc']}")
+                lbl.pack(anchor='center', pady=2, before=self.results_home)
 
     # ---------- Leaderboard ----------
     def _populate_leaderboard(self):
@@ -708,20 +3013,121 @@ class EnhancedMathsQuizApp(Tk):
             w.destroy()
         
         Label(f, text='Leaderboard', font=(MAIN_FONT, 28, 'bold'), bg=self._THEME["MAIN_BG"], fg=self._THEME["TEXT_LIGHT"]).pack(pady=20)
+
+        # filters: applied through leaderboard_log.index.query, one page at a time
+        bar = Frame(f, bg=self._THEME["MAIN_BG"])
+        bar.pack(fill='x', padx=40)
+        Label(bar, text='Difficulty', font=(MAIN_FONT, 12), bg=self._THEME["MAIN_BG"], fg=self._THEME["MUTED"]).pack(side='left')
+        self.lb_difficulty = ttk.Combobox(bar, values=['All'] + list(DIFFICULTY), state='readonly', width=10)
+        self.lb_difficulty.set('All')
+        self.lb_difficulty.pack(side='left', padx=(5, 15))
+        Label(bar, text='Player', font=(MAIN_FONT, 12), bg=self._THEME["MAIN_BG"], fg=self._THEME["MUTED"]).pack(side='left')
+        self.lb_name = ttk.Combobox(bar, width=14)
+        self.lb_name.pack(side='left', padx=(5, 15))
+        Label(bar, text='From', font=(MAIN_FONT, 12), bg=self._THEME["MAIN_BG"], fg=self._THEME["MUTED"]).pack(side='left')
+        self.lb_since = Entry(bar, width=11, bg=self._THEME["ENTRY_BG"], fg=self._THEME["TEXT_LIGHT"], insertbackground=self._THEME["TEXT_LIGHT"], relief='flat')
+        self.lb_since.pack(side='left', padx=(5, 15))
+        Label(bar, text='To', font=(MAIN_FONT, 12), bg=self._THEME["MAIN_BG"], fg=self._THEME["MUTED"]).pack(side='left')
+        self.lb_until = Entry(bar, width=11, bg=self._THEME["ENTRY_BG"], fg=self._THEME["TEXT_LIGHT"], insertbackground=self._THEME["TEXT_LIGHT"], relief='flat')
+        self.lb_until.pack(side='left', padx=(5, 15))
+        self.lb_order = ttk.Combobox(bar, values=['Best first', 'Newest first'], state='readonly', width=12)
+        self.lb_order.set('Best first')
+        self.lb_order.pack(side='left', padx=(0, 15))
+        Button(bar, text='Apply', font=(MAIN_FONT, 11), command=self._apply_leaderboard_filters).pack(side='left')
         
         cols = ('Rank', 'Name', 'Score', 'Difficulty', 'When')
-        tree = ttk.Treeview(f, columns=cols, show='headings')
+        body = Frame(f, bg=self._THEME["MAIN_BG"])
+        body.pack(fill='both', expand=True, padx=40, pady=20)
+        self.lb_tree = tree = ttk.Treeview(body, columns=cols, show='headings')
+        self.lb_scroll = ttk.Scrollbar(body, orient='vertical', command=tree.yview)
+        tree.configure(yscrollcommand=self._on_leaderboard_scroll)
         
         for c in cols:
             tree.heading(c, text=c)
             tree.column(c, anchor='center', width=150)
             
-        tree.pack(fill='both', expand=True, padx=40, pady=20)
-        
-        for i, r in enumerate(leaderboard[:50], start=1):
-            tree.insert('', 'end', values=(i, r.get('name'), r.get('score'), r.get('difficulty', '-'), r.get('time', '-')))
-            
-        Button(f, text='Back', width=15, font=(MAIN_FONT, 12), command=lambda: self.show_frame('home')).pack(pady=20)
+        self.lb_scroll.pack(side='right', fill='y')
+        tree.pack(side='left', fill='both', expand=True)
+        self._lb_rows, self._lb_values = [], []
+        self._lb_filters, self._lb_cursor = {}, None
+        self._refresh_leaderboard()
+
+        def replay_selected():
+            sel = tree.selection()
+            if not sel:
+                return
+            rec = self._lb_rows[int(sel[0])]
+            if rec.get('seed') is None:
+                messagebox.showinfo('Replay', 'This result was recorded before quizzes were seeded.')
+                return
+            self.begin_quiz(replay=rec)
+
+        btns = Frame(f, bg=self._THEME["MAIN_BG"])
+        btns.pack(pady=20)
+        Button(btns, text='Replay Quiz', width=15, font=(MAIN_FONT, 12), command=replay_selected).pack(side='left', padx=10)
+        Button(btns, text='Back', width=15, font=(MAIN_FONT, 12), command=lambda: self.show_frame('home')).pack(side='left', padx=10)
+
+    def _leaderboard_values(self, start, rows):
+        return [(i, r.get('name'), r.get('score'), r.get('difficulty', '-'), r.get('time', '-')) for i, r in enumerate(rows, start=start)]
+
+    def _refresh_leaderboard(self):
+        # re-run the first page and diff it against what the tree shows; iids are
+        # row positions, so only rows whose values moved are touched. Pages loaded
+        # by scrolling are dropped and fetched again on demand.
+        tree = self.lb_tree
+        page = leaderboard_log.index.query(**self._lb_filters)
+        rows = page['rows']
+        new = self._leaderboard_values(1, rows)
+        old = self._lb_values
+        changed = False
+        for i, vals in enumerate(new):
+            if i >= len(old):
+                tree.insert('', 'end', iid=str(i), values=vals)
+            elif old[i] != vals:
+                tree.item(str(i), values=vals)
+                changed = True
+        for i in range(len(new), len(old)):
+            tree.delete(str(i))
+        if changed and tree.selection():
+            tree.selection_remove(tree.selection())
+        self._lb_rows, self._lb_values, self._lb_cursor = rows, new, page['cursor']
+        self.lb_name['values'] = leaderboard_log.index.names()
+
+    def _load_more_leaderboard(self):
+        page = leaderboard_log.index.query(cursor=self._lb_cursor, **self._lb_filters)
+        start = len(self._lb_rows)
+        vals = self._leaderboard_values(start + 1, page['rows'])
+        for i, v in enumerate(vals, start=start):
+            self.lb_tree.insert('', 'end', iid=str(i), values=v)
+        self._lb_rows.extend(page['rows'])
+        self._lb_values.extend(vals)
+        self._lb_cursor = page['cursor']
+
+    def _on_leaderboard_scroll(self, first, last):
+        self.lb_scroll.set(first, last)
+        # fetch the next page once the view gets near the bottom of what is loaded
+        if self._lb_cursor is not None and float(last) > 0.9:
+            self._load_more_leaderboard()
+
+    def _apply_leaderboard_filters(self):
+        since, until = self.lb_since.get().strip() or None, self.lb_until.get().strip() or None
+        for d in (since, until):
+            if d is not None:
+                try:
+                    date.fromisoformat(d)
+                except ValueError:
+                    messagebox.showinfo('Leaderboard', f'"{d}" is not a date (use YYYY-MM-DD).')
+                    return
+        diff, name = self.lb_difficulty.get(), self.lb_name.get().strip()
+        self._lb_filters = {
+            'difficulty': None if diff == 'All' else diff,
+            'name': name or None,
+            'since': since,
+            'until': until,
+            'order': 'newest' if self.lb_order.get() == 'Newest first' else 'rank',
+        }
+        self._refresh_leaderboard()
+        self.lb_tree.yview_moveto(0)
 
     # ---------- Profiles ----------
     def _populate_profiles(self):
@@ -740,20 +3146,65 @@ class EnhancedMathsQuizApp(Tk):
         right = Frame(content, bg=self._THEME["MAIN_BG"])
         right.pack(side='right', fill='both', expand=True)
 
-        self.profile_listbox = Listbox(left, height=15, width=25, bg=self._THEME["ENTRY_BG"], fg=self._THEME["TEXT_LIGHT"], bd=0, highlightthickness=0, font=(MAIN_FONT, 14))
-        self.profile_listbox.pack(fill='y', expand=True)
-        
-        for name in profiles.keys():
-            self.profile_listbox.insert('end', name)
+        # filter-as-you-type over the store's name index; only visible rows are rendered
+        self.profile_search = StringVar()
+        search = Entry(left, textvariable=self.profile_search, width=25, bg=self._THEME["ENTRY_BG"], fg=self._THEME["TEXT_LIGHT"],
+                       insertbackground=self._THEME["TEXT_LIGHT"], relief='flat', font=(MAIN_FONT, 14))
+        search.pack(fill='x', pady=(0, 10))
+        self.profile_list = VirtualList(left, fetch=lambda start, k: profiles.search(self.profile_search.get(), start, k),
+                                        count=lambda: profiles.count(self.profile_search.get()), rows=15,
+                                        on_select=self._render_profile_detail, width=25, bg=self._THEME["ENTRY_BG"],
+                                        fg=self._THEME["TEXT_LIGHT"], bd=0, highlightthickness=0, font=(MAIN_FONT, 14))
+        self.profile_list.pack(fill='y', expand=True)
+        self.profile_list.refresh()
+        self.profile_search.trace_add('write', lambda *_: self._filter_profiles())
             
         btn_grp = Frame(left, bg=self._THEME["MAIN_BG"])
         btn_grp.pack(pady=10)
         Button(btn_grp, text='New', command=self.create_profile).pack(side='left', padx=5)
         Button(btn_grp, text='Delete', command=self.delete_profile).pack(side='left', padx=5)
 
-        self.profile_detail = Frame(right, bg='#0b1220', bd=1, relief='solid')
+        self.profile_detail = Frame(right, bg=self._THEME["PRIMARY_BG"], bd=1, relief='solid')
         self.profile_detail.pack(fill='both', expand=True)
-        self.profile_listbox.bind('<<ListboxSelect>>', self._on_profile_select)
+
+        # detail view: one set of labels, filled in by _render_profile_detail
+        self._detail_name = None
+        self.detail_con = d_con = Frame(self.profile_detail, bg=self._THEME["PRIMARY_BG"])
+        self.detail_title = Label(d_con, font=(MAIN_FONT, 28, 'bold'), bg=self._THEME["PRIMARY_BG"], fg=self._THEME["TEXT_LIGHT"])
+        self.detail_title.pack(pady=10, anchor='w')
+        self.detail_created = Label(d_con, font=(MAIN_FONT, 14), bg=self._THEME["PRIMARY_BG"], fg=self._THEME["MUTED"])
+        self.detail_created.pack(anchor='w')
+        self.detail_last = Label(d_con, font=(MAIN_FONT, 16), bg=self._THEME["PRIMARY_BG"], fg=self._THEME["ACCENT"])
+        self.detail_last.pack(pady=10, anchor='w')
+        self.detail_summary = Label(d_con, font=(MAIN_FONT, 14), justify='left', bg=self._THEME["PRIMARY_BG"], fg=self._THEME["MUTED"])
+        self.detail_summary.pack(anchor='w')
+        self.detail_latency = Label(d_con, font=(MAIN_FONT, 14), bg=self._THEME["PRIMARY_BG"], fg=self._THEME["MUTED"])
+        self.detail_latency.pack(anchor='w')
+
+        # progress chart: items are created once; a resize only rescales the
+        # cached downsampled points into a single coords() call
+        self._chart = None
+        self.detail_chart = c = Canvas(d_con, height=160, bg=self._THEME["PRIMARY_BG"], highlightthickness=0)
+        c.pack(fill='x', pady=(15, 0))
+        self._chart_mid = c.create_line(0, 0, 0, 0, dash=(2, 4))
+        self._chart_line = c.create_line(0, 0, 0, 0, width=2)
+        self._chart_caption = c.create_text(0, 0, anchor='nw', font=(MAIN_FONT, 11))
+        c.bind('<Configure>', lambda e: self._draw_chart())
+        
+        Label(d_con, text='Achievements:', font=(MAIN_FONT, 18, 'bold'), bg=self._THEME["PRIMARY_BG"], fg=self._THEME["TEXT_LIGHT"]).pack(pady=(20, 10), anchor='w')
+        self.detail_none = Label(d_con, text='None yet', font=(MAIN_FONT, 14), bg=self._THEME["PRIMARY_BG"], fg=self._THEME["MUTED"])
+        self.detail_ach = [Label(d_con, font=(MAIN_FONT, 14), bg=self._THEME["PRIMARY_BG"], fg=self._THEME["TEXT_LIGHT"]) for _ in ACHIEVEMENTS_DEF]
+
+    def _filter_profiles(self):
+        self.profile_list.offset = 0
+        self.profile_list.refresh()
+
+    def _refresh_profiles(self):
+        self.profile_list.refresh()
+        if self._detail_name in profiles:
+            self._render_profile_detail(self._detail_name)
+        else:
+            self._clear_profile_detail()
 
     def create_profile(self):
         name = simpledialog.askstring('New Profile', 'Enter a profile name (max 24 chars):')
@@ -765,60 +3216,165 @@ class EnhancedMathsQuizApp(Tk):
             return
         
         profiles[name] = self._default_profile(name)
-        save_json_file(PROFILES_FILE, profiles)
         
-        self._refresh_profile_widgets()
-        self._populate_profiles()
+        prefix = self.profile_search.get()
+        if not name.casefold().startswith(prefix.casefold()):
+            self.profile_search.set('')
+            prefix = ''
+        self.profile_list.show(name, profiles.position(name, prefix))
+        self._mark_dirty('quiz_setup')
         self._render_profile_detail(name)
 
     def delete_profile(self):
-        sel = self.profile_listbox.curselection()
-        if not sel:
+        name = self.profile_list.selected
+        if name is None or name not in profiles:
             return
-        name = self.profile_listbox.get(sel[0])
         if messagebox.askyesno('Confirm', f'Delete profile {name}?'):
             if name == self.current_profile:
                 self.current_profile = None 
 
             profiles.pop(name, None)
-            save_json_file(PROFILES_FILE, profiles)
+            progress_charts.invalidate(name)
             
-            self._refresh_profile_widgets() 
-            self._populate_profiles()
-
-    def _on_profile_select(self, event):
-        sel = event.widget.curselection()
-        if not sel:
-            return
-        name = event.widget.get(sel[0])
-        self._render_profile_detail(name)
+            self.profile_list.selected = None
+            self.profile_list.refresh()
+            self._mark_dirty('quiz_setup')
+            self._clear_profile_detail()
 
     def _render_profile_detail(self, name):
-        for w in self.profile_detail.winfo_children():
-            w.destroy()
         p = profiles.get(name, self._default_profile(name))
+        self._detail_name = name
+
+        self.detail_title.config(text=name)
+        self.detail_created.config(text=f"Created: {p.get('created', '-')}")
+        self.detail_last.config(text=f"Last score: {p.get('last_score','-')}")
+        hs = history_summary(p)
+        speeds = latency_by_operator(p)
+        self.detail_latency.config(text='Avg response: ' + ('   '.join(f"{op} {sec:.1f}s" for op, sec in sorted(speeds.items())) if speeds else '-'))
+        week = history_week_stats(p, _week_key(date.today().isoformat()))
+        this_week = f"This week: {week['count']} quiz(zes), average {week['mean']:.1f}, best {week['best']}" if week else "This week: no quizzes yet"
+        self.detail_summary.config(text=f"Quizzes: {hs['count']}   Average: {hs['mean']:.1f}   Best: {hs['best'] if hs['best'] is not None else '-'}   Streak: {hs['streak']} day(s) (best {hs['best_streak']})\n{this_week}")
         
-        # Container inside detail view
-        d_con = Frame(self.profile_detail, bg='#0b1220')
-        d_con.pack(padx=30, pady=30, fill='both')
-
-        Label(d_con, text=name, font=(MAIN_FONT, 28, 'bold'), bg='#0b1220', fg=self._THEME["TEXT_LIGHT"]).pack(pady=10, anchor='w')
-        Label(d_con, text=f"Created: {p.get('created', '-')}", font=(MAIN_FONT, 14), bg='#0b1220', fg=self._THEME["MUTED"]).pack(anchor='w')
-        Label(d_con, text=f"Last score: {p.get('last_score','-')}", font=(MAIN_FONT, 16), bg='#0b1220', fg=self._THEME["ACCENT"]).pack(pady=10, anchor='w')
-        
-        Label(d_con, text='Achievements:', font=(MAIN_FONT, 18, 'bold'), bg='#0b1220', fg=self._THEME["TEXT_LIGHT"]).pack(pady=(20, 10), anchor='w')
-        
-        if not p.get('achievements'):
-            Label(d_con, text='None yet', font=(MAIN_FONT, 14), bg='#0b1220', fg=self._THEME["MUTED"]).pack(anchor='w')
+        self._chart = progress_charts.get(name, p)
+        self._draw_chart()
         
-        for aid in p.get('achievements', []):
-            a = next((x for x in ACHIEVEMENTS_DEF if x['id'] == aid), None)
-            if a:
-                Label(d_con, text=f"• {a['title']}", font=(MAIN_FONT, 14), bg='#0b1220', fg=self._THEME["TEXT_LIGHT"]).pack(anchor='w', padx=10)
+        owned = [ACHIEVEMENTS_BY_ID[aid] for aid in p.get('achievements', []) if aid in ACHIEVEMENTS_BY_ID]
+        if p.get('achievements'):
+            self.detail_none.pack_forget()
+        else:
+            self.detail_none.pack(anchor='w')
+        for i, lbl in enumerate(self.detail_ach):
+            if i < len(owned):
+                lbl.config(text=f"• {owned[i]['title']}")
+                lbl.pack(anchor='w', padx=10)
+            else:
+                lbl.pack_forget()
+        if not self.detail_con.winfo_ismapped():
+            self.detail_con.pack(padx=30, pady=30, fill='both')
+
+    def _draw_chart(self):
+        c = self.detail_chart
+        t = self._THEME
+        c.itemconfig(self._chart_line, fill=t["ACCENT"])
+        c.itemconfig(self._chart_mid, fill=t["MUTED"])
+        c.itemconfig(self._chart_caption, fill=t["MUTED"])
+        w, h, pad = c.winfo_width(), c.winfo_height(), 8
+        if self._chart is None or w <= 2 * pad:
+            return
+        n, pts = self._chart
+        if not pts:
+            c.coords(self._chart_line, 0, 0, 0, 0)
+            c.coords(self._chart_mid, 0, 0, 0, 0)
+            c.itemconfig(self._chart_caption, text='No quizzes yet')
+            return
+        top = max(QUESTIONS_PER_QUIZ * 10, max(y for _, y in pts)) or 1
+        sx = (w - 2 * pad) / max(1, n - 1)
+        sy = (h - 2 * pad) / top
+        flat = []
+        for x, y in pts:
+            flat += (pad + x * sx, h - pad - y * sy)
+        if len(flat) == 2:
+            flat += flat
+        c.coords(self._chart_line, *flat)
+        c.coords(self._chart_mid, pad, h / 2, w - pad, h / 2)
+        c.coords(self._chart_caption, pad, pad)
+        shown = f" (showing {len(pts)})" if len(pts) < n else ''
+        c.itemconfig(self._chart_caption, text=f"Score over {n} results{shown}, oldest to newest")
+
+    def _clear_profile_detail(self):
+        self._detail_name = None
+        self.detail_con.pack_forget()
 
     def _default_profile(self, name):
         return {'name': name, 'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'history': [], 'achievements': [], 'last_score': None}
 
+    # ---------- Statistics ----------
+    SPARK = '▁▂▃▄▅▆▇█'
+
+    def _spark(self, values):
+        top = max(values) if values else 0
+        return ''.join(self.SPARK[min(7, v * 8 // top)] if top else self.SPARK[0] for v in values)
+
+    def _populate_stats(self):
+        f = self.frames['stats']
+        for w in f.winfo_children():
+            w.destroy()
+
+        Label(f, text='Class Statistics', font=(MAIN_FONT, 28, 'bold'), bg=self._THEME["MAIN_BG"], fg=self._THEME["TEXT_LIGHT"]).pack(pady=20)
+        self.stats_totals = Label(f, font=(MAIN_FONT, 16), bg=self._THEME["MAIN_BG"], fg=self._THEME["ACCENT"])
+        self.stats_totals.pack()
+
+        cols = ('Difficulty', 'Quizzes', 'Avg score', 'Avg time', 'Scores 0% → 100%')
+        self.stats_tree = ttk.Treeview(f, columns=cols, show='headings', height=len(DIFFICULTY))
+        for c in cols:
+            self.stats_tree.heading(c, text=c)
+            self.stats_tree.column(c, anchor='center', width=260 if c.startswith('Scores') else 130)
+        self.stats_tree.pack(fill='x', padx=40, pady=20)
+
+        body = Frame(f, bg=self._THEME["MAIN_BG"])
+        body.pack(fill='both', expand=True, padx=40)
+        left = Frame(body, bg=self._THEME["MAIN_BG"])
+        left.pack(side='left', fill='both', expand=True)
+        right = Frame(body, bg=self._THEME["MAIN_BG"])
+        right.pack(side='right', fill='both', expand=True)
+
+        Label(left, text='Achievement unlock rates', font=(MAIN_FONT, 16, 'bold'), bg=self._THEME["MAIN_BG"], fg=self._THEME["TEXT_LIGHT"]).pack(anchor='w')
+        Label(left, text='Players without a profile count together as one "Guest".', font=(MAIN_FONT, 11), bg=self._THEME["MAIN_BG"], fg=self._THEME["MUTED"]).pack(anchor='w', pady=(0, 10))
+        self.stats_ach = {}
+        for a in ACHIEVEMENTS_DEF:
+            lbl = Label(left, font=(MAIN_FONT, 13), bg=self._THEME["MAIN_BG"], fg=self._THEME["TEXT_LIGHT"])
+            lbl.pack(anchor='w')
+            self.stats_ach[a['id']] = lbl
+
+        Label(right, text='Active players (last 14 days)', font=(MAIN_FONT, 16, 'bold'), bg=self._THEME["MAIN_BG"], fg=self._THEME["TEXT_LIGHT"]).pack(anchor='w', pady=(0, 10))
+        self.stats_daily = Label(right, font=(MATH_FONT, 28), bg=self._THEME["MAIN_BG"], fg=self._THEME["ACCENT"])
+        self.stats_daily.pack(anchor='w')
+        self.stats_daily_caption = Label(right, font=(MAIN_FONT, 12), bg=self._THEME["MAIN_BG"], fg=self._THEME["MUTED"])
+        self.stats_daily_caption.pack(anchor='w')
+
+        Button(f, text='Back', width=15, font=(MAIN_FONT, 12), command=lambda: self.show_frame('home')).pack(pady=20)
+        self._refresh_stats()
+
+    def _refresh_stats(self):
+        st = global_stats.summary()
+        self.stats_totals.config(text=f"{st['quizzes']} quizzes by {st['players']} player(s)")
+        tree = self.stats_tree
+        order = list(DIFFICULTY) + sorted(k for k in st['difficulty'] if k not in DIFFICULTY)
+        for diff in order:
+            d = st['difficulty'].get(diff)
+            vals = (diff, 0, '-', '-', '') if d is None else (
+                diff, d['count'], f"{d['mean_score']:.1f}", '-' if d['mean_time'] is None else f"{d['mean_time']:.0f}s", self._spark(d['hist']))
+            if tree.exists(diff):
+                tree.item(diff, values=vals)
+            else:
+                tree.insert('', 'end', iid=diff, values=vals)
+        for a in ACHIEVEMENTS_DEF:
+            n, rate = st['achievements'][a['id']]
+            self.stats_ach[a['id']].config(text=f"{a['title']}: {n} player(s) ({rate:.0%})")
+        counts = [n for _, n in st['daily']]
+        self.stats_daily.config(text=self._spark(counts))
+        self.stats_daily_caption.config(text=f"Today: {counts[-1]}   Peak: {max(counts)}   ({st['daily'][0][0]} → {st['daily'][-1][0]})")
+
     # ---------- Settings ----------
     def _populate_settings(self):
         f = self.frames['settings']
@@ -832,75 +3388,118 @@ class EnhancedMathsQuizApp(Tk):
         
         Button(f, text='Back', width=15, font=(MAIN_FONT, 12), command=lambda: self.show_frame('home')).pack(pady=40)
 
-    def _refresh_profile_widgets(self):
-        profiles_list = list(profiles.keys())
-        
-        if hasattr(self, 'profile_select') and self.profile_select.winfo_exists():
-            current_state = self.profile_select['state']
-            self.profile_select['state'] = 'normal'
-            self.profile_select['values'] = profiles_list if profiles_list else ['Anonymous']
-            if current_state == 'readonly':
-                 self.profile_select['state'] = 'readonly'
-            
-            if self.current_profile and self.current_profile in profiles_list:
-                self.profile_select.set(self.current_profile)
-            elif profiles_list:
-                self.profile_select.set(profiles_list[0])
-            else:
-                self.profile_select.set('Anonymous')
-
-        if hasattr(self, 'profile_listbox') and self.profile_listbox.winfo_exists():
-            self.profile_listbox.delete(0, 'end')
-            for name in profiles_list:
-                self.profile_listbox.insert('end', name)
+    def _filter_profile_select(self):
+        typed = self.profile_select.get().strip()
+        if typed == 'Anonymous' or typed in profiles:
+            typed = ''
+        self.profile_select['values'] = profiles.search(typed, 0, PROFILE_PICK_LIMIT) or ['Anonymous']
 
-            if hasattr(self, 'profile_detail'):
-                for w in self.profile_detail.winfo_children():
-                    w.destroy()
+    def _refresh_profile_select(self):
+        if self.current_profile and self.current_profile in profiles:
+            self.profile_select.set(self.current_profile)
+        else:
+            first = profiles.search('', 0, 1)
+            self.profile_select.set(first[0] if first else 'Anonymous')
 
     def _toggle_dark(self):
         self.dark_mode = not self.dark_mode
-        bg = '#0f1724' if self.dark_mode else '#f3f4f6'
-        for k, fr in self.frames.items():
-            try:
-                fr.config(bg=bg)
-            except Exception:
-                pass
+        self.theme.switch('dark' if self.dark_mode else 'light')
 
     def _clear_leaderboard(self):
         if messagebox.askyesno('Confirm', 'Clear the leaderboard?'):
-            global leaderboard
-            leaderboard = []
-            save_json_file(LEADERBOARD_FILE, leaderboard)
+            leaderboard_log.clear()
             messagebox.showinfo('Cleared', 'Leaderboard cleared.')
-            self._populate_leaderboard()
-
-    # ---------- Achievements ----------
-    def _evaluate_achievements(self, perfect, total_time, pct):
-        earned = []
-        if total_time and total_time <= 30:
-            earned.append('speed_demon')
-        if pct >= 90:
-            earned.append('brain_master')
-        if perfect:
-            earned.append('perfect_run')
-        
-        if len(self.questions_attempted) >= 3:
-            initial_score_points = sum(
-                10 if a[3] and self.questions_attempted.index(a) < 1 else 5 if a[3] else 0 
-                for a in self.questions_attempted[:3] if a[3] is not None
-            )
-            initial_pct = (initial_score_points / 30) * 100 if 30 > 0 else 0 
-            
-            if initial_pct < 30 and pct >= 50:
-                 earned.append('comeback')
-                 
-        if self.current_profile:
-            existing = set(profiles.get(self.current_profile, {}).get('achievements', []))
-            new = [e for e in earned if e not in existing]
-            return new
-        return earned
+            self._mark_dirty('leaderboard')
+
+#--- Startup benchmark ---
+# Builds a data directory with `records` leaderboard results and `n_profiles`
+# profiles, then starts the app in a fresh interpreter and reports how long the
+# import, the first painted frame and the background data load took.
+_STARTUP_PROBE = r'''
+import importlib.util, json, sys, time
+t0 = time.perf_counter()
+spec = importlib.util.spec_from_file_location('mathsquiz', sys.argv[1])
+mq = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(mq)
+t1 = time.perf_counter()
+app = mq.EnhancedMathsQuizApp()
+app.update()
+t2 = time.perf_counter()
+while app.data_loaded_at is None:
+    app.update()
+    time.sleep(0.002)
+app.show_frame('leaderboard')
+app.update()
+t3 = time.perf_counter()
+app.destroy()
+print(json.dumps({'import_ms': (t1 - t0) * 1000, 'first_paint_ms': (t2 - t0) * 1000,
+                  'data_loaded_ms': (app.data_loaded_at - t0) * 1000, 'interactive_ms': (t3 - t0) * 1000}))
+'''
+
+def benchmark_startup(records=200000, n_profiles=5000, seed=0):
+    import subprocess, sys, tempfile
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        names = [f'player{i}' for i in range(n_profiles)]
+        recs = [{'name': rng.choice(names), 'score': rng.randrange(0, 101, 5), 'difficulty': rng.choice(list(DIFFICULTY)),
+                 'time': f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00', 'seed': rng.randrange(2 ** 32), 'ops': '+-'}
+                for _ in range(records)]
+        atomic_write_json(os.path.join(tmp, LEADERBOARD_FILE), {'epoch': 0, 'records': recs})
+        os.makedirs(os.path.join(tmp, PROFILES_DIR))
+        atomic_write_json(os.path.join(tmp, PROFILES_DIR, 'index.json'), {n: ProfileStore._shard_name(n) for n in names})
+        out = subprocess.run([sys.executable, '-c', _STARTUP_PROBE, os.path.abspath(__file__)], cwd=tmp,
+                             capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+    result.update(records=records, profiles=n_profiles)
+    return {k: round(v, 1) if isinstance(v, float) else v for k, v in result.items()}
 
 if __name__ == '__main__':
-    app = EnhancedMathsQuizApp()
-    app.mainloop()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description='Enhanced Maths Quiz')
+    parser.add_argument('--simulate', type=int, metavar='PLAYERS', help='run the headless simulation instead of the GUI')
+    parser.add_argument('--accuracy', type=float, default=0.8)
+    parser.add_argument('--latency', type=float, nargs=2, default=(1.0, 6.0), metavar=('MIN', 'MAX'))
+    parser.add_argument('--difficulty', choices=list(DIFFICULTY), default='Moderate')
+    parser.add_argument('--timer', type=int, default=15)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--ops', default='+-', help='operator symbols, e.g. "+-", "×÷" or "+-×÷"')
+    parser.add_argument('--worksheets', metavar='NAMES_FILE', help='write printable worksheets, one per name in the file')
+    parser.add_argument('--questions', type=int, default=20, help='questions per worksheet')
+    parser.add_argument('--out', default='worksheets.html')
+    parser.add_argument('--bench-theme', type=int, metavar='WIDGETS', help='time a theme switch over this many widgets')
+    parser.add_argument('--bench-startup', type=int, metavar='RECORDS', help='time startup against this many leaderboard results')
+    parser.add_argument('--serve', action='store_true', help='host a class quiz for networked players')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=CLASS_PORT)
+    parser.add_argument('--rounds', type=int, default=1)
+    parser.add_argument('--min-players', type=int, default=1)
+    parser.add_argument('--lobby', type=float, default=10.0, help='seconds to wait for more players before round one')
+    parser.add_argument('--load-test', type=int, metavar='PLAYERS', help='run a class server against this many bots')
+    parser.add_argument('--attempt-stats', nargs='?', const=ATTEMPT_LOG, metavar='LOG', help='summarise response times in the binary attempt log')
+    args = parser.parse_args()
+
+    if args.simulate:
+        stats = simulate(args.simulate, args.accuracy, tuple(args.latency), args.difficulty, args.timer, args.seed, args.ops)
+        print(json.dumps(stats, indent=2))
+    elif args.bench_startup:
+        print(json.dumps(benchmark_startup(args.bench_startup, max(1, args.bench_startup // 40)), indent=2))
+    elif args.serve:
+        server = QuizServer(args.host, args.port, args.difficulty, args.ops, QUESTIONS_PER_QUIZ, args.timer, args.seed,
+                            args.rounds, args.min_players, args.lobby)
+        print(f"Class quiz on port {args.port}; waiting for {args.min_players} player(s)")
+        asyncio.run(server.serve())
+    elif args.load_test:
+        print(json.dumps(class_load_test(args.load_test, args.accuracy, tuple(args.latency), args.difficulty, args.ops,
+                                         timer_seconds=args.timer, seed=args.seed), indent=2))
+    elif args.attempt_stats:
+        print(json.dumps(summarize_attempts(AttemptLog(args.attempt_stats)), indent=2))
+    elif args.bench_theme:
+        print(json.dumps(benchmark_theme_switch(args.bench_theme), indent=2))
+    elif args.worksheets:
+        with open(args.worksheets, encoding='utf-8') as nf:
+            names = [line.strip() for line in nf if line.strip()]
+        write_worksheets(args.out, names, args.difficulty, args.ops, args.questions, args.seed)
+        print(f"Wrote {len(names)} worksheet(s) to {args.out}")
+    else:
+        app = EnhancedMathsQuizApp()
+        app.mainloop()
\ No newline at end of file
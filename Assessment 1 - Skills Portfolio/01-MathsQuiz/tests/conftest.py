@@ -0,0 +1,23 @@
+import importlib.util
+import os
+
+import pytest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '01-MathsQuiz.py')
+
+
+@pytest.fixture(scope='session')
+def mq():
+    # the app is a single script, so load it by path; its Tk window only opens under __main__
+    spec = importlib.util.spec_from_file_location('mathsquiz', APP)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(autouse=True)
+def in_tmp(tmp_path, monkeypatch, mq):
+    # the app writes its data files relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    yield
+    mq.persistence.flush(5)
@@ -0,0 +1,36 @@
+import asyncio
+import json
+
+
+async def _lines(reader, until):
+    out = []
+    while True:
+        msg = json.loads(await asyncio.wait_for(reader.readline(), 5))
+        out.append(msg)
+        if until(msg):
+            return out
+
+
+def test_bad_messages_get_invalid_acks_and_the_round_still_records(mq, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(mq.QuizServer, '_record_round', lambda self, results: recorded.extend(name for name, _, _ in results))
+
+    async def run():
+        server = mq.QuizServer('127.0.0.1', 0, 'Easy', '+-', 2, 2, 1, rounds=1, min_players=1, lobby_seconds=0.1, gap=0.1)
+        server.ready = asyncio.Event()
+        serving = asyncio.ensure_future(server.serve())
+        await server.ready.wait()
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        writer.write(b'[]\n{"type": "join", "name": "eve"}\n')
+        await _lines(reader, lambda m: m['type'] == 'question')
+        acks = []
+        for bad in (b'5\n', b'"x"\n', json.dumps({'type': 'answer', 'q': 0, 'answer': 10 ** 10}).encode() + b'\n'):
+            writer.write(bad)
+            acks.append((await _lines(reader, lambda m: m['type'] == 'ack'))[-1]['result'])
+        await _lines(reader, lambda m: m['type'] == 'round_end')
+        writer.close()
+        await serving
+        return acks
+
+    assert asyncio.run(run()) == ['invalid', 'invalid', 'invalid']
+    assert recorded == ['eve']
@@ -0,0 +1,50 @@
+import random
+from datetime import date, timedelta
+
+
+def brute(entries, key):
+    # (count, mean, best) per key over the un-rolled history
+    out = {}
+    for when, score in entries:
+        out.setdefault(key(when), []).append(score)
+    return {k: {'count': len(v), 'mean': sum(v) / len(v), 'best': max(v)} for k, v in out.items()}
+
+
+def test_day_and_week_queries_match_the_raw_history(mq, monkeypatch):
+    monkeypatch.setattr(mq, 'HISTORY_RAW_LIMIT', 7)
+    monkeypatch.setattr(mq, 'HISTORY_DAILY_DAYS', 20)
+    rng = random.Random(5)
+    start = date(2024, 1, 1)
+    entries = []
+    for offset in sorted(rng.sample(range(400), 150)):
+        for _ in range(rng.randint(1, 4)):
+            entries.append(((start + timedelta(days=offset)).isoformat() + f" {rng.randint(8, 20):02d}:00:00", rng.randint(0, 100)))
+    p = {}
+    for when, score in entries:
+        mq.history_append(p, score, when)
+    assert p['weekly'] and p['daily'] and len(p['history']) == 7  # every tier is in use
+
+    days = brute(entries, lambda when: when[:10])
+    for offset in range(400):
+        day = (start + timedelta(days=offset)).isoformat()
+        got, want = mq.history_day_stats(p, day), days.get(day)
+        assert (got is None) == (want is None), day
+        if want:
+            assert (got['count'], got['best']) == (want['count'], want['best']) and abs(got['mean'] - want['mean']) < 1e-9, day
+
+    weeks = brute(entries, lambda when: mq._week_key(when[:10]))
+    for week, want in weeks.items():
+        got = mq.history_week_stats(p, week)
+        assert (got['count'], got['best']) == (want['count'], want['best']) and abs(got['mean'] - want['mean']) < 1e-9, week
+
+    summary = mq.history_summary(p)
+    assert summary['count'] == len(entries) and summary['best'] == max(s for _, s in entries)
+
+
+def test_lapsed_streak_reads_zero(mq):
+    p = {}
+    mq.history_append(p, 50, '2020-01-01 10:00:00')
+    mq.history_append(p, 60, '2020-01-02 10:00:00')
+    assert mq.history_summary(p)['streak'] == 0 and mq.history_summary(p)['best_streak'] == 2
+    mq.history_append(p, 70)
+    assert mq.history_summary(p)['streak'] == 1
@@ -0,0 +1,82 @@
+import pytest
+
+
+class Crash(BaseException):
+    pass
+
+
+def open_log(mq, tmp_path):
+    return mq.LeaderboardLog(str(tmp_path / 'leaderboard.json'), str(tmp_path / 'leaderboard.log.jsonl'), compact_every=10 ** 6)
+
+
+def add(log, *names):
+    for name in names:
+        log.append({'name': name, 'score': 10, 'difficulty': 'Easy', 'time': '2026-01-01 10:00:00'})
+
+
+def names(log):
+    log.ensure_loaded()
+    return sorted(r['name'] for r in log.records)
+
+
+def crash_on(monkeypatch, owner, attr, nth):
+    # make the nth call of owner.attr die as a process crash would
+    real = getattr(owner, attr)
+    calls = [0]
+
+    def hook(*args, **kwargs):
+        calls[0] += 1
+        if calls[0] == nth:
+            raise Crash(attr)
+        return real(*args, **kwargs)
+    monkeypatch.setattr(owner, attr, hook)
+
+
+@pytest.mark.parametrize('step', [('os', 'replace'), ('module', 'atomic_write_json'), ('os', 'remove')])
+@pytest.mark.parametrize('nth', [1, 2, 3])
+def test_interrupted_compactions_keep_every_result_once(mq, tmp_path, monkeypatch, step, nth):
+    owner = mq.os if step[0] == 'os' else mq
+    log = open_log(mq, tmp_path)
+    add(log, 'A0', 'A1', 'A2')
+    log.compact()
+    add(log, 'B')
+    expected = ['A0', 'A1', 'A2', 'B']
+    for round_names in (['C0', 'C1', 'C2'], ['D0']):
+        with monkeypatch.context() as m:
+            crash_on(m, owner, step[1], nth)
+            try:
+                log.compact()
+            except Crash:
+                pass
+        log = open_log(mq, tmp_path)  # restart
+        assert names(log) == expected
+        add(log, *round_names)
+        expected = sorted(expected + round_names)
+    log = open_log(mq, tmp_path)
+    assert names(log) == expected
+    log.compact()
+    assert names(open_log(mq, tmp_path)) == expected
+
+
+def test_clear_after_interrupted_compaction(mq, tmp_path, monkeypatch):
+    log = open_log(mq, tmp_path)
+    add(log, 'A')
+    with monkeypatch.context() as m:
+        crash_on(m, mq, 'atomic_write_json', 1)
+        with pytest.raises(Crash):
+            log.compact()
+    log = open_log(mq, tmp_path)
+    log.clear()
+    add(log, 'B')
+    assert names(open_log(mq, tmp_path)) == ['B']
+
+
+def test_torn_tail_is_cut_before_the_next_append(mq, tmp_path):
+    log = open_log(mq, tmp_path)
+    add(log, 'A')
+    with open(log.log_path, 'a', encoding='utf-8') as f:
+        f.write('{"name": "to')  # the process died mid-write
+    log = open_log(mq, tmp_path)
+    assert names(log) == ['A']
+    add(log, 'B')
+    assert names(open_log(mq, tmp_path)) == ['A', 'B']
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+
+def make_records(mq, n, seed):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        out.append({'name': rng.choice(['ann', 'bob', 'cy', 'dee']),
+                    'score': rng.randint(0, 10) * 10,
+                    'difficulty': rng.choice(list(mq.DIFFICULTY)),
+                    'time': f"2024-0{rng.randint(1, 3)}-{rng.randint(10, 12)} 1{rng.randint(0, 1)}:00:00"})
+    return out
+
+
+def all_pages(lb, limit, **filters):
+    rows, page = [], lb.query(limit=limit, **filters)
+    while True:
+        assert len(page['rows']) <= limit
+        rows.extend(page['rows'])
+        if page['cursor'] is None:
+            return rows
+        page = lb.query(cursor=page['cursor'], limit=limit, **filters)
+
+
+def brute(records, difficulty=None, name=None, since=None, until=None, order='rank'):
+    seq = list(enumerate(records))
+    if order == 'rank':
+        seq.sort(key=lambda p: (-p[1]['score'], p[1]['time'], p[0]))
+    else:
+        seq.sort(key=lambda p: (p[1]['time'], p[0]), reverse=True)
+    return [r for _, r in seq
+            if (difficulty is None or r['difficulty'] == difficulty)
+            and (name is None or r['name'] == name)
+            and (since is None or r['time'] >= since)
+            and (until is None or r['time'][:len(until)] <= until)]
+
+
+@pytest.fixture
+def lb(mq, monkeypatch):
+    monkeypatch.setattr(mq.RankedIndex, 'LOAD', 4)  # small buckets so pages cross splits
+    records = make_records(mq, 300, seed=3)
+    board = mq.RankedLeaderboard.from_records(records[:120])
+    for rec in records[120:]:
+        board.add(rec)
+    return board, records
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'difficulty': 'Easy'},
+    {'name': 'bob'},
+    {'name': 'cy', 'difficulty': 'Advanced'},
+    {'since': '2024-02', 'until': '2024-02-11'},
+    {'order': 'newest'},
+    {'order': 'newest', 'name': 'ann', 'since': '2024-01-11', 'until': '2024-03'},
+    {'order': 'newest', 'difficulty': 'Moderate', 'until': '2024-02-12 10'},
+])
+@pytest.mark.parametrize('limit', [1, 7, 50])
+def test_paged_queries_match_a_sorted_list(lb, filters, limit):
+    board, records = lb
+    assert [id(r) for r in all_pages(board, limit, **filters)] == [id(r) for r in brute(records, **filters)]
+
+
+def test_rank_counts_strictly_better_results(mq, lb):
+    board, records = lb
+    for rec in records[::17]:
+        key = (-rec['score'], rec['time'])
+        better = [r for r in records if (-r['score'], r['time']) < key]
+        assert board.rank(rec) == len(better) + 1
+        same = [r for r in better if r['difficulty'] == rec['difficulty']]
+        assert board.rank(rec, rec['difficulty']) == len(same) + 1
@@ -0,0 +1,46 @@
+class FakeTk:
+    def __init__(self):
+        self.pending = {}
+        self._next = 0
+
+    def after(self, ms, fn):
+        self._next += 1
+        self.pending[self._next] = fn
+        return self._next
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run_once(self):
+        after_id, fn = self.pending.popitem()
+        fn()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_failing_callbacks_do_not_stop_the_other_timers(mq, capsys):
+    tk, clock = FakeTk(), Clock()
+    sched = mq.FrameScheduler(tk, clock)
+    ran = []
+
+    def boom(*_):
+        raise RuntimeError('boom')
+
+    sched.call_later(0.1, boom)
+    sched.call_later(0.1, lambda: ran.append('timer'))
+    sched.add_ticker('bad', boom)
+    sched.add_ticker('good', lambda now: ran.append(('tick', now)) or 0.05)
+    clock.now = 0.2
+    tk.run_once()
+    assert ran == ['timer', ('tick', 0.2)]
+    assert len(tk.pending) == 1   # the next frame is still booked
+    clock.now = 0.3
+    tk.run_once()
+    assert ran[-1] == ('tick', 0.3)
+    assert 'boom' in capsys.readouterr().out
@@ -2,8 +2,18 @@ from tkinter import *
 from tkinter import messagebox
 import random
 import os
+import sys
 import threading
 import time
+import mmap
+import struct
+import argparse
+import json
+import base64
+import bisect
+from collections import deque
+from itertools import accumulate
+from array import array
 
 #Initialize sound system
 try:
@@ -39,26 +49,519 @@ BTN_PRIMARY = "#0984e3"
 BTN_SUCCESS = "#00b894"    
 BTN_WARNING = "#6c5ce7"    
 
+#Joke files at least this big are served from an offset index instead of a list
+CORPUS_INDEX_MIN_BYTES = 4 * 1024 * 1024
+INDEX_MAGIC = b"JOKEIDX1"
+INDEX_HEADER = struct.Struct("<8sqqq")  #magic, corpus size, corpus mtime_ns, joke count
+INDEX_ENTRY = struct.Struct("<Q")       #byte offset of one joke line
+STATE_FILE = "jokeState.json"           #where the shuffle position survives restarts
+MASK64 = (1 << 64) - 1
+RATINGS_FILE = "jokeRatings.json"
+RATING_HALF_LIFE = 14 * 24 * 3600       #seconds until a like or skip counts half as much
+RATING_SAVE_MS = 5000                   #rating changes are written at most this often
+GIF_DEFAULT_DELAY_MS = 100              #what browsers use for frames declaring a 0 or 1 cs delay
+
+def corpus_key(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+def parse_joke_line(raw):
+    #"setup?punchline" -> (setup + "?", punchline), None for any other line
+    line = raw.decode("utf-8", errors="ignore") if isinstance(raw, bytes) else raw
+    if "?" in line:
+        parts = line.strip().split("?", 1)
+        if len(parts) == 2:
+            return (parts[0] + "?", parts[1])
+    return None
+
+def load_jokes(path):
+    #Parsed jokes are cached as JSON in "<file>.cache" and reused while the
+    #file's path, size and mtime still match. The key is the cache's first line
+    #and is checked before the rest is read. Otherwise the file is parsed in one
+    #streaming pass; a line with bad bytes only loses those bytes.
+    cache_path = path + ".cache"
+    key = [os.path.abspath(path)] + list(corpus_key(path))
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            if json.loads(f.readline()) == key:
+                return [(setup, punchline) for setup, punchline in json.loads(f.read())]
+    except Exception:
+        pass
+    with open(path, "rb") as f:
+        jokes = [joke for joke in map(parse_joke_line, f) if joke]
+    try:
+        with open(cache_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(json.dumps(key) + "\n" + json.dumps(jokes))
+        os.replace(cache_path + ".tmp", cache_path)
+    except OSError:
+        pass
+    return jokes
+
+def _mix64(x):
+    #splitmix64 finaliser, the round function of ShuffleBag's permutation
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+class ShuffleBag:
+    #Deals every index in range(size) once, in random order, before any repeats.
+    #The order is a Feistel permutation keyed by the seed, so the whole state is
+    #(seed, position) however big the corpus is. Values outside range(size) are
+    #cycle-walked; the domain is under 4 * size, so a draw is O(1) on average.
+    ROUNDS = 4
+
+    def __init__(self, size, seed=None, position=0):
+        self.size = size
+        self.half = max(1, ((size - 1).bit_length() + 1) // 2)
+        self.mask = (1 << self.half) - 1
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.position = position if 0 <= position <= size else 0
+
+    def _permute(self, x):
+        left, right = x >> self.half, x & self.mask
+        for r in range(self.ROUNDS):
+            left, right = right, left ^ (_mix64(self.seed ^ (r << 60) ^ right) & self.mask)
+        return (left << self.half) | right
+
+    def __getitem__(self, i):
+        x = self._permute(i)
+        while x >= self.size:
+            x = self._permute(x)
+        return x
+
+    def draw(self):
+        if self.position >= self.size:
+            #bag empty: deal a new order that doesn't start with the joke just shown
+            last = self[self.size - 1]
+            self.seed, self.position = random.getrandbits(64), 0
+            while self.size > 1 and self[0] == last:
+                self.seed = random.getrandbits(64)
+        self.position += 1
+        return self[self.position - 1]
+
+    def state(self):
+        return {"size": self.size, "seed": self.seed, "position": self.position}
+
+    @classmethod
+    def from_state(cls, size, state):
+        if not state or state.get("size") != size:
+            return cls(size)
+        return cls(size, state["seed"], state["position"])
+
+def _skip_sub_blocks(data, pos):
+    while data[pos]:
+        pos += data[pos] + 1
+    return pos + 1
+
+def split_gif(data):
+    #Walks a GIF's blocks once -> (prefix, [(frame blocks, delay ms)]). prefix is the
+    #header, screen descriptor and global colour table, so prefix + blocks + b";"
+    #is a complete one-frame GIF.
+    if data[:6] not in (b"GIF87a", b"GIF89a"):
+        raise ValueError("not a GIF file")
+    pos = 13 + (3 << ((data[10] & 7) + 1) if data[10] & 0x80 else 0)
+    prefix, frames = data[:pos], []
+    start, delay = pos, 0
+    try:
+        while data[pos] != 0x3B:
+            if data[pos] == 0x21:
+                if data[pos + 1] == 0xF9:  #graphic control: delay in hundredths of a second
+                    delay = struct.unpack_from("<H", data, pos + 4)[0] * 10
+                pos = _skip_sub_blocks(data, pos + 2)
+            elif data[pos] == 0x2C:
+                flags = data[pos + 9]
+                pos += 10 + (3 << ((flags & 7) + 1) if flags & 0x80 else 0)
+                pos = _skip_sub_blocks(data, pos + 1)
+                frames.append((data[start:pos], delay if delay > 10 else GIF_DEFAULT_DELAY_MS))
+                start, delay = pos, 0
+            else:
+                raise ValueError(f"bad GIF block at byte {pos}")
+    except IndexError:
+        pass  #truncated file: keep the frames that were complete
+    return prefix, frames
+
+class GifFrames:
+    #An animated GIF parsed once into self-contained one-frame GIFs, so decoding
+    #frame i costs only frame i. Frames become PhotoImages on first use (or in
+    #idle time via preload) and stay cached; instances are shared per file.
+    _cache = {}
+
+    @classmethod
+    def open(cls, path):
+        key = (path,) + corpus_key(path)
+        frames = cls._cache.get(key)
+        if frames is None:
+            frames = cls._cache[key] = cls(path)
+        return frames
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.prefix, frames = split_gif(f.read())
+        if not frames:
+            raise ValueError("GIF has no frames")
+        self._blocks = [blocks for blocks, _ in frames]
+        self.delays = [delay for _, delay in frames]
+        self.images = [None] * len(frames)
+
+    def __len__(self):
+        return len(self.images)
+
+    def __getitem__(self, i):
+        if self.images[i] is None:
+            data = base64.b64encode(self.prefix + self._blocks[i] + b";").decode("ascii")
+            try:
+                self.images[i] = PhotoImage(data=data, format="gif")
+            except TclError:
+                if not i: raise
+                self.images[i] = self[i - 1]  #undecodable frame: hold the previous one
+            self._blocks[i] = None
+        return self.images[i]
+
+    def preload(self, widget, i=0):
+        #decode one frame per idle callback so the window stays responsive
+        while i < len(self.images) and self.images[i] is not None:
+            i += 1
+        if i < len(self.images):
+            self[i]
+            widget.after_idle(self.preload, widget, i + 1)
+
+class FrameAnimator:
+    #Plays frames with per-frame delays on a label against the clock. Each tick
+    #shows the frame that is due now, so when the loop falls behind, late frames
+    #are dropped rather than queued. Playback pauses while the label is unmapped,
+    #fully obscured or the window iconified, and resumes from the same spot.
+    FPS_WINDOW = 1.0  #seconds of displayed frames averaged into fps
+
+    def __init__(self, root, label, frames, delays, on_stats=None, clock=time.monotonic):
+        self.root = root
+        self.label = label
+        self.frames = frames
+        self.ends = list(accumulate(d / 1000 for d in delays))  #cycle offset where each frame ends
+        self.period = self.ends[-1]
+        self.on_stats = on_stats
+        self.clock = clock
+        self.running = False
+        self.obscured = False
+        self.after_id = None
+        self.offset = 0.0   #timeline position while paused
+        self.started = 0.0
+        self.last_frame = -1
+        self.shown = 0
+        self.dropped = 0
+        self.stamps = deque()
+        self.reported = 0.0
+        for widget in (label, root):
+            widget.bind("<Map>", self._sync, add="+")
+            widget.bind("<Unmap>", self._sync, add="+")
+        label.bind("<Visibility>", self._on_visibility, add="+")
+
+    def _on_visibility(self, e):
+        self.obscured = e.state == "VisibilityFullyObscured"
+        self._sync()
+
+    def visible(self):
+        return self.label.winfo_ismapped() and not self.obscured and self.root.state() != "iconic"
+
+    def start(self):
+        self.stop()
+        self.running = True
+        self._sync()
+
+    def stop(self):
+        self.running = False
+        self._sync()
+        self.offset, self.last_frame = 0.0, -1
+        self.stamps.clear()
+
+    def _sync(self, e=None):
+        play = self.running and self.visible()
+        if play and self.after_id is None:
+            self.started = self.clock() - self.offset
+            self._tick()
+        elif not play and self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+            self.offset = self.clock() - self.started
+
+    def _tick(self):
+        now = self.clock()
+        cycles, pos = divmod(now - self.started, self.period)
+        i = min(bisect.bisect_right(self.ends, pos), len(self.ends) - 1)
+        frame = int(cycles) * len(self.ends) + i
+        if frame != self.last_frame:
+            if self.last_frame >= 0:
+                self.dropped += max(0, frame - self.last_frame - 1)
+            self.last_frame = frame
+            self.label.configure(image=self.frames[i], text="")
+            self.shown += 1
+            self.stamps.append(now)
+        while self.stamps and self.stamps[0] <= now - self.FPS_WINDOW:
+            self.stamps.popleft()
+        if self.on_stats and now - self.reported >= 1.0:
+            self.reported = now
+            self.on_stats(self.stats())
+        due = self.started + cycles * self.period + self.ends[i]
+        self.after_id = self.root.after(int((due - now) * 1000) + 1, self._tick)
+
+    @property
+    def fps(self):
+        return len(self.stamps) / self.FPS_WINDOW
+
+    def stats(self):
+        return {"fps": self.fps, "shown": self.shown, "dropped": self.dropped}
+
+class AliasTable:
+    #Vose's alias method: O(n) build, then O(1) weighted draws of items
+    def __init__(self, items, weights):
+        n = len(items)
+        self.items = items
+        self.total = sum(weights)
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        scaled = [w * n / self.total for w in weights] if n else []
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s], self.alias[s] = scaled[s], l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+
+    def draw(self):
+        i = random.randrange(len(self.items))
+        return self.items[i if random.random() < self.prob[i] else self.alias[i]]
+
+class JokeRatings:
+    #Like/skip counters per joke index, decaying with RATING_HALF_LIFE. Decay is
+    #lazy: a counter is [likes, skips, stamp] and is brought up to date only when
+    #it is touched or read. Only rated jokes have a counter.
+    def __init__(self, path=RATINGS_FILE, half_life=RATING_HALF_LIFE, clock=time.time):
+        self.path = path
+        self.half_life = half_life
+        self.clock = clock
+        self.counts = {}
+        self.version = 0  #bumped on every change, so a rebuild can tell it is stale
+        self.saved_version = 0
+        self.lock = threading.Lock()
+
+    def _decayed(self, c, now):
+        f = 0.5 ** (max(0.0, now - c[2]) / self.half_life)
+        return c[0] * f, c[1] * f
+
+    def rate(self, index, liked):
+        now = self.clock()
+        with self.lock:
+            likes, skips = self._decayed(self.counts.get(index, [0.0, 0.0, now]), now)
+            self.counts[index] = [likes + liked, skips + (not liked), now]
+            self.version += 1
+
+    @staticmethod
+    def weight(likes, skips):
+        #an unrated joke weighs 1; each net like doubles it, each net skip halves it
+        return min(8.0, max(0.125, 2.0 ** (likes - skips)))
+
+    def weights(self):
+        now = self.clock()
+        with self.lock:
+            snapshot = list(self.counts.items()), self.version
+        return [i for i, _ in snapshot[0]], [self.weight(*self._decayed(c, now)) for _, c in snapshot[0]], snapshot[1]
+
+    def load(self, corpus):
+        #indices only mean something for the joke file they were recorded against
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("corpus") == corpus:
+                self.counts = {int(i): c for i, c in data["counts"].items()}
+        except Exception:
+            pass
+
+    def save(self, corpus):
+        with self.lock:
+            if self.version == self.saved_version:
+                return
+            data = {"corpus": corpus, "counts": {str(i): c for i, c in self.counts.items()}}
+            version = self.version
+        try:
+            with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(self.path + ".tmp", self.path)
+            self.saved_version = version
+        except OSError as e:
+            print(f"Could not save joke ratings: {e}")
+
+class JokePicker:
+    #Picks joke indices with probability proportional to their rating weight.
+    #Rated jokes (usually few) live in an alias table and the unrated rest come
+    #from the shuffle bag, so a pick is O(1) and unrated jokes still never repeat
+    #early. After ratings change the table is rebuilt on a worker thread and
+    #swapped in whole; picks meanwhile use the previous table.
+    def __init__(self, bag, ratings):
+        self.bag = bag
+        self.ratings = ratings
+        self.table, self.rated, self.built_version = AliasTable([], []), frozenset(), -1
+        self._building = False
+        self._build_lock = threading.Lock()
+        self.refresh(background=False)
+
+    def refresh(self, background=True):
+        with self._build_lock:
+            if self._building or self.built_version == self.ratings.version:
+                return
+            self._building = True
+        if background:
+            threading.Thread(target=self._rebuild, daemon=True).start()
+        else:
+            self._rebuild()
+
+    def _rebuild(self):
+        while True:
+            items, weights, version = self.ratings.weights()
+            table = AliasTable(items, weights)
+            self.table, self.rated, self.built_version = table, frozenset(items), version
+            with self._build_lock:
+                if version == self.ratings.version:
+                    self._building = False
+                    return
+
+    def pick(self):
+        table, rated = self.table, self.rated
+        unrated = self.bag.size - len(rated)
+        if rated and random.random() * (unrated + table.total) >= unrated:
+            return table.draw()
+        while True:
+            i = self.bag.draw()
+            if i not in rated:
+                return i
+
+class JokeCorpus:
+    #Read-only sequence of (setup, punchline) over a joke file of any size.
+    #A "<file>.idx" next to it holds the byte offset of every joke line and is
+    #rebuilt when the file's size or mtime change. Both files are memory-mapped,
+    #so opening costs O(1) and only the joke asked for is ever decoded.
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.key = corpus_key(path)
+        self._files = []
+        self._data = self._index = None
+        try:
+            self._data = self._map(path)
+            self._index = self._map(self.index_path) if self._index_valid() else self._build_index()
+            self.count = INDEX_HEADER.unpack_from(self._index)[3]
+        except Exception:
+            self.close()
+            raise
+
+    def _map(self, path):
+        f = open(path, "rb")
+        self._files.append(f)
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _index_valid(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                magic, size, mtime_ns, count = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+            expected = INDEX_HEADER.size + count * INDEX_ENTRY.size
+            return magic == INDEX_MAGIC and (size, mtime_ns) == self.key and os.path.getsize(self.index_path) == expected
+        except (OSError, struct.error):
+            return False
+
+    def _build_index(self):
+        #One streaming pass; offsets are flushed in blocks so memory stays flat
+        tmp = self.index_path + ".tmp"
+        try:
+            out = open(tmp, "wb")
+        except OSError:
+            out = None  #read-only folder: keep the index in memory instead
+        blob = bytearray()
+        write = out.write if out else blob.extend
+        try:
+            write(INDEX_HEADER.pack(INDEX_MAGIC, *self.key, 0))
+            count, pos, block = 0, 0, array("Q")
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if b"?" in line:
+                        block.append(pos)
+                        if len(block) >= 65536:
+                            count += self._write_block(write, block)
+                            block = array("Q")
+                    pos += len(line)
+            count += self._write_block(write, block)
+            header = INDEX_HEADER.pack(INDEX_MAGIC, *self.key, count)
+            if out is None:
+                blob[:INDEX_HEADER.size] = header
+                return bytes(blob)
+            out.seek(0)
+            out.write(header)
+            out.close()
+            os.replace(tmp, self.index_path)
+        except Exception:
+            #never leave a half-written index behind
+            if out:
+                out.close()
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+            raise
+        return self._map(self.index_path)
+
+    @staticmethod
+    def _write_block(write, block):
+        if sys.byteorder != "little":
+            block.byteswap()
+        write(block.tobytes())
+        return len(block)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        start = INDEX_ENTRY.unpack_from(self._index, INDEX_HEADER.size + i * INDEX_ENTRY.size)[0]
+        end = self._data.find(b"\n", start)
+        return parse_joke_line(self._data[start:end if end >= 0 else len(self._data)])
+
+    def close(self):
+        for m in (self._data, self._index):
+            if isinstance(m, mmap.mmap):
+                m.close()
+        for f in self._files:
+            f.close()
+
 class JokeApp:
-    def __init__(self, root):
+    def __init__(self, root, corpus_path=None):
         self.root = root
         self.root.title("Alexa Joke App")
         self.root.geometry("500x750") 
         
         self.jokes_list = []
+        self.corpus_key = None
+        self.bag = None
+        self.ratings = JokeRatings()
+        self.picker = None
+        self.ratings_save_id = None
+        self.current_index = None
         self.current_setup = ""
         self.current_punchline = ""
         self.using_backup = False
+        self.using_index = False
+        self.corpus_path = corpus_path
         self.is_dark_mode = True 
         
         #Animation state
         self.emoji_frames = [] 
-        self.anim_id = None    
+        self.animator = None
 
         #Determine script directory for asset loading
         self.script_dir = os.path.dirname(os.path.abspath(__file__))
 
         self.load_data()
+        self.load_state()
         self.load_background()
         
         #Apply initial theme
@@ -84,6 +587,7 @@ class JokeApp:
         #Instruction text
         status_text = f"Status: {len(self.jokes_list)} Jokes Ready"
         if self.using_backup: status_text += " (Backup Mode)"
+        if self.using_index: status_text += " (Indexed)"
 
         instruction_text = (
             "HOW TO USE:\n"
@@ -105,6 +609,7 @@ class JokeApp:
         )
         self.lbl_instructions.pack(pady=10, padx=20)
 
+        self.status_text = status_text
         self.lbl_status = Label(self.card, text=status_text, font=("Segoe UI", 8, "italic"), bg=self.current_theme["card"], fg="#b2bec3")
         self.lbl_status.pack(pady=(0, 5))
 
@@ -130,6 +635,12 @@ class JokeApp:
         
         self.btn_copy = Button(self.tools_frame, text="📋 Copy", command=self.copy_to_clipboard, bg=self.current_theme["btn_tool_bg"], fg=self.current_theme["btn_tool_text"], relief="groove")
         self.btn_copy.pack(side="left", padx=(40, 10))
+
+        self.btn_like = Button(self.tools_frame, text="👍 Like", command=lambda: self.rate_joke(True), bg=self.current_theme["btn_tool_bg"], fg=self.current_theme["btn_tool_text"], relief="groove")
+        self.btn_like.pack(side="left", padx=5)
+
+        self.btn_skip = Button(self.tools_frame, text="👎 Skip", command=lambda: self.rate_joke(False), bg=self.current_theme["btn_tool_bg"], fg=self.current_theme["btn_tool_text"], relief="groove")
+        self.btn_skip.pack(side="left", padx=5)
         
         self.btn_fav = Button(self.tools_frame, text="❤️ Save", command=self.save_favorite, bg=self.current_theme["btn_tool_bg"], fg=COLOR_ACCENT, relief="groove")
         self.btn_fav.pack(side="right", padx=(10, 40))
@@ -147,8 +658,9 @@ class JokeApp:
         
         self.btn_next = Button(self.controls_frame, text="➡️  Next Joke", command=self.get_joke, bg=BTN_WARNING, fg="white", font=btn_font, relief="flat", height=2)
 
-        self.btn_quit = Button(self.card, text="❌ Quit", command=root.destroy, bg=self.current_theme["card"], fg="#b2bec3", relief="flat", bd=0)
+        self.btn_quit = Button(self.card, text="❌ Quit", command=self.quit, bg=self.current_theme["card"], fg="#b2bec3", relief="flat", bd=0)
         self.btn_quit.place(relx=0.5, rely=0.97, anchor="center")
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
         
         #Initialize animation
         self.load_gif()
@@ -177,19 +689,14 @@ class JokeApp:
             messagebox.showerror("Asset Error", "Could not find 'ezgif.com-webp-to-gif-converter.gif'.\nPlease put it in the same folder as this script.")
             return
 
-        #Load frames for animation
+        #Parse frames for animation; they are decoded lazily and in idle time
         try:
             img_path = img_path.replace("\\", "/")
-            i = 0
-            while True:
-                try:
-                    frame = PhotoImage(file=img_path, format=f"gif -index {i}")
-                    self.emoji_frames.append(frame)
-                    i += 1
-                except TclError:
-                    break 
-                except Exception:
-                    break
+            try:
+                self.emoji_frames = GifFrames.open(img_path)
+                self.root.after_idle(self.emoji_frames.preload, self.root)
+            except Exception as e:
+                print(f"Animation parse failed: {e}")
             
             #Fallback: Load as static image if animation fails
             if len(self.emoji_frames) == 0:
@@ -201,12 +708,12 @@ class JokeApp:
                 except Exception as e:
                     messagebox.showerror("Format Error", f"Found file but could not read it.\n\nTech Error: {e}\n\nMake sure it is a valid GIF.")
             else:
-                print(f"Success! Loaded {len(self.emoji_frames)} frames.")
+                print(f"Success! Found {len(self.emoji_frames)} frames.")
 
         except Exception as e:
             messagebox.showerror("Load Error", f"Error loading GIF:\n{e}")
 
-    def start_animation(self, frame_index=0):
+    def start_animation(self):
         if not self.emoji_frames: 
             self.lbl_emoji.config(text="(Emoji Missing)", image="")
             return
@@ -216,15 +723,18 @@ class JokeApp:
              self.lbl_emoji.configure(image=self.emoji_frames[0], text="")
              return
 
-        self.lbl_emoji.configure(image=self.emoji_frames[frame_index], text="")
-        next_index = (frame_index + 1) % len(self.emoji_frames)
-        self.anim_id = self.root.after(50, self.start_animation, next_index)
+        if self.animator is None:
+            self.animator = FrameAnimator(self.root, self.lbl_emoji, self.emoji_frames, self.emoji_frames.delays, on_stats=self.show_fps)
+        self.animator.start()
 
     def stop_animation(self):
-        if self.anim_id:
-            self.root.after_cancel(self.anim_id)
-            self.anim_id = None
+        if self.animator:
+            self.animator.stop()
         self.lbl_emoji.pack_forget()
+        self.lbl_status.config(text=self.status_text)
+
+    def show_fps(self, stats):
+        self.lbl_status.config(text=f"{self.status_text} | {stats['fps']:.0f} fps, {stats['dropped']} dropped")
 
     def toggle_theme(self):
         self.is_dark_mode = not self.is_dark_mode
@@ -241,6 +751,8 @@ class JokeApp:
         self.lbl_emoji.configure(bg=colors["card"])
         self.tools_frame.configure(bg=colors["card"])
         self.btn_copy.configure(bg=colors["btn_tool_bg"], fg=colors["btn_tool_text"])
+        self.btn_like.configure(bg=colors["btn_tool_bg"], fg=colors["btn_tool_text"])
+        self.btn_skip.configure(bg=colors["btn_tool_bg"], fg=colors["btn_tool_text"])
         self.btn_fav.configure(bg=colors["btn_tool_bg"])
         self.controls_frame.configure(bg=colors["card"])
         self.btn_quit.configure(bg=colors["card"])
@@ -259,35 +771,75 @@ class JokeApp:
 
     def load_data(self):
     
-        txt_path = self.get_asset_path(["randomJokes.txt"])
+        txt_path = self.corpus_path or self.get_asset_path(["randomJokes.txt"])
         if not txt_path:
             self.using_backup = True
             self.jokes_list = [("Why did the developer quit? 💻?", "Because he didn't get arrays.")]
             return
 
-        success = False
+        #Big corpora (or one named on the command line) are indexed, not loaded
         try:
-            with open(txt_path, "r", encoding="utf-8") as file:
-                self.parse_jokes(file)
-            if self.jokes_list: success = True
-        except UnicodeDecodeError:
-            try:
-                with open(txt_path, "r", errors="ignore") as file:
-                    self.parse_jokes(file)
-                if self.jokes_list: success = True
-            except: pass
+            self.corpus_key = list(corpus_key(txt_path))
+            if self.corpus_path or os.path.getsize(txt_path) >= CORPUS_INDEX_MIN_BYTES:
+                corpus = JokeCorpus(txt_path)
+                if corpus:
+                    self.jokes_list = corpus
+                    self.using_index = True
+                    return
+                corpus.close()
+        except Exception as e:
+            print(f"Corpus index failed: {e}")
+
+        try:
+            self.jokes_list = load_jokes(txt_path)
         except: pass
 
-        if not success:
+        if not self.jokes_list:
             self.using_backup = True
             self.jokes_list = [("Backup Joke?", "The file failed to load.")]
 
-    def parse_jokes(self, file):
-        for line in file.readlines():
-            if "?" in line:
-                parts = line.strip().split("?", 1)
-                if len(parts) == 2:
-                    self.jokes_list.append((parts[0] + "?", parts[1]))
+    def load_state(self):
+        #The shuffle bag resumes where the last session stopped, unless the joke file changed
+        state = {}
+        try:
+            with open(STATE_FILE, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except Exception:
+            pass
+        same_corpus = not self.using_backup and state.get("corpus") == self.corpus_key
+        self.bag = ShuffleBag.from_state(len(self.jokes_list), state.get("bag") if same_corpus else None)
+        if not self.using_backup:
+            self.ratings.load(self.corpus_key)
+        self.picker = JokePicker(self.bag, self.ratings)
+
+    def save_state(self):
+        try:
+            with open(STATE_FILE + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"corpus": self.corpus_key, "bag": self.bag.state()}, f)
+            os.replace(STATE_FILE + ".tmp", STATE_FILE)
+        except OSError as e:
+            print(f"Could not save joke state: {e}")
+
+    def rate_joke(self, liked):
+        if self.current_index is None: return
+        self.ratings.rate(self.current_index, liked)
+        self.picker.refresh()
+        #clicks are batched: one write per RATING_SAVE_MS at most
+        if self.ratings_save_id is None and not self.using_backup:
+            self.ratings_save_id = self.root.after(RATING_SAVE_MS, self.flush_ratings)
+        if not liked:
+            self.get_joke()
+
+    def flush_ratings(self):
+        self.ratings_save_id = None
+        if not self.using_backup:
+            self.ratings.save(self.corpus_key)
+
+    def quit(self):
+        if self.ratings_save_id:
+            self.root.after_cancel(self.ratings_save_id)
+        self.flush_ratings()
+        self.root.destroy()
 
     def play_start_sound(self):
         if SOUND_AVAILABLE:
@@ -317,6 +869,7 @@ class JokeApp:
             try:
                 with open("favoriteJokes.txt", "a", encoding="utf-8") as f:
                     f.write(f"{self.current_setup} {self.current_punchline}\n")
+                self.rate_joke(True)
                 messagebox.showinfo("Saved", "Saved to favorites!")
             except Exception as e:
                 messagebox.showerror("Error", str(e))
@@ -324,7 +877,9 @@ class JokeApp:
     def get_joke(self):
         if not self.jokes_list: return
         self.stop_animation() 
-        self.current_setup, self.current_punchline = random.choice(self.jokes_list)
+        self.current_index = self.picker.pick()
+        self.current_setup, self.current_punchline = self.jokes_list[self.current_index]
+        self.save_state()
         self.lbl_setup.config(text=self.current_setup)
         self.lbl_punchline.config(text="") 
         self.play_start_sound()
@@ -344,6 +899,10 @@ class JokeApp:
         self.btn_next.pack(fill="x")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Alexa Joke App")
+    parser.add_argument("--corpus", metavar="FILE", help="serve jokes from FILE through an on-disk offset index")
+    args = parser.parse_args()
+
     root = Tk()
-    app = JokeApp(root)
+    app = JokeApp(root, corpus_path=args.corpus)
     root.mainloop()
\ No newline at end of file
@@ -1,7 +1,15 @@
 from tkinter import *
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import os
 import sys
+import csv
+import io
+import json
+import gzip
+import lzma
+import html
+import queue
+import threading
 
 #--- PALETTE (PREMIUM DARK THEME) ---
 COLORS = {
@@ -29,6 +37,112 @@ FONTS = {
     'table_body': ("Segoe UI", 10)
 }
 
+#--- EXPORT ENGINE ---
+#Every format is a generator of text chunks over the rows, so the output is
+#streamed straight to disk and never built up in memory.
+EXPORT_FIELDS = ['code', 'name', 'cw1', 'cw2', 'cw3', 'cw_total', 'exam', 'percent', 'grade']
+EXPORT_GRADES = ['A', 'B', 'C', 'D', 'F']
+EXPORT_FORMATS = {'CSV': '.csv', 'JSON Lines': '.jsonl', 'HTML Report': '.html'}
+EXPORT_COMPRESSION = {'None': '', 'gzip': '.gz', 'xz (lzma)': '.xz'}
+EXPORT_PROGRESS_EVERY = 2000   #Rows between progress reports
+
+class ExportCancelled(Exception):
+    pass
+
+def export_csv_chunks(rows, tick):
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(EXPORT_FIELDS)
+    for s in rows:
+        writer.writerow([s[k] for k in EXPORT_FIELDS])
+        tick()
+        if buf.tell() > 65536:
+            yield buf.getvalue()
+            buf.seek(0); buf.truncate()
+    yield buf.getvalue()
+
+def export_jsonl_chunks(rows, tick):
+    batch = []
+    for s in rows:
+        tick()
+        batch.append(json.dumps({k: s[k] for k in EXPORT_FIELDS}, ensure_ascii=False))
+        if len(batch) >= 1000:
+            yield "\n".join(batch) + "\n"
+            batch = []
+    if batch: yield "\n".join(batch) + "\n"
+
+def export_html_chunks(rows, tick):
+    #One pass per grade keeps the sections grouped without buffering any rows
+    esc = html.escape
+    yield ("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Student Report</title>\n"
+           "<style>body{font-family:'Segoe UI',sans-serif;background:#0f172a;color:#f8fafc;margin:40px}"
+           "table{border-collapse:collapse;width:100%;margin-bottom:30px}"
+           "th,td{padding:8px 12px;text-align:left;border-bottom:1px solid #334155}"
+           "th{background:#334155}h2{margin-top:40px}</style></head><body>\n"
+           "<h1>Student Report</h1>\n")
+    head = "".join(f"<th>{esc(k)}</th>" for k in EXPORT_FIELDS)
+    total, total_p = 0, 0.0
+    for g in EXPORT_GRADES:
+        count, sum_p = 0, 0.0
+        yield (f"<h2 style=\"color:{COLORS['grade_' + g]}\">Grade {g}</h2>\n"
+               f"<table><tr>{head}</tr>\n")
+        batch = []
+        for s in rows:
+            tick()
+            if s['grade'] != g: continue
+            count += 1
+            sum_p += s['percent']
+            batch.append("<tr>" + "".join(f"<td>{esc(str(s[k]))}</td>" for k in EXPORT_FIELDS) + "</tr>\n")
+            if len(batch) >= 1000:
+                yield "".join(batch)
+                batch = []
+        yield "".join(batch) + "</table>\n"
+        avg = round(sum_p / count, 2) if count else 0
+        yield f"<p>{count} student(s), average {avg}%</p>\n"
+        total += count
+        total_p += sum_p
+    avg = round(total_p / total, 2) if total else 0
+    yield f"<h2>Summary</h2>\n<p>{total} student(s), class average {avg}%</p>\n</body></html>\n"
+
+EXPORT_WRITERS = {
+    'CSV': (export_csv_chunks, 1),
+    'JSON Lines': (export_jsonl_chunks, 1),
+    'HTML Report': (export_html_chunks, len(EXPORT_GRADES)),   #(generator, passes over rows)
+}
+
+def open_export_stream(path, compression):
+    if compression == 'gzip':
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    if compression == 'xz (lzma)':
+        return lzma.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+def stream_export(rows, path, fmt, compression='None', progress=None, cancel=None):
+    #rows must be re-iterable (the HTML report walks it once per grade)
+    gen, passes = EXPORT_WRITERS[fmt]
+    total = len(rows) * passes
+    done = [0]
+
+    def tick():
+        done[0] += 1
+        if done[0] % EXPORT_PROGRESS_EVERY == 0:
+            if cancel is not None and cancel.is_set():
+                raise ExportCancelled()
+            if progress: progress(done[0], total)
+
+    tmp = path + ".part"
+    try:
+        with open_export_stream(tmp, compression) as out:
+            for chunk in gen(rows, tick):
+                out.write(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+    if progress: progress(total, total)
+    return done[0] // passes
+
 class StudentManagerApp:
     def __init__(self, root):
         self.root = root
@@ -46,6 +160,9 @@ class StudentManagerApp:
             
         self.filename = os.path.join(self.app_path, "studentMarks.txt")
         self.students = [] 
+        self.view = self.students  #Rows currently shown in the table (filtered/sorted)
+        self.export_queue = queue.Queue()
+        self.export_cancel = None
 
         self.setup_styles()
         self.create_interface()
@@ -106,6 +223,7 @@ class StudentManagerApp:
         self.add_nav_item("Add Student", self.add_student_window, icon="➕")
         self.add_nav_item("Update", self.update_student_window, icon="✏️")
         self.add_nav_item("Delete", self.delete_student, icon="🗑️")
+        self.add_nav_item("Export Report", self.export_window, icon="📤")
 
         #--- Main Area ---
         self.canvas = Canvas(self.root, bg=COLORS['bg_fallback'], highlightthickness=0)
@@ -282,6 +400,7 @@ class StudentManagerApp:
         #Clear existing
         for i in self.tree.get_children(): self.tree.delete(i)
         d = data if data else self.students
+        self.view = d
         
         #Populate
         total_p = 0
@@ -447,6 +566,91 @@ class StudentManagerApp:
         create_entry("Coursework 3 (0-20)", 'cw3')
         create_entry("Final Exam (0-100)", 'exam')
 
+    #--- Export ---
+    def export_window(self):
+        if self.export_cancel is not None:
+            messagebox.showinfo("Export", "An export is already running.")
+            return
+        win = Toplevel(self.root)
+        win.title("Export Report")
+        win.geometry("420x430")
+        win.configure(bg=COLORS['card_bg'])
+        Label(win, text="Export Report", font=("Segoe UI", 14, "bold"), bg=COLORS['card_bg'], fg=COLORS['text_light']).pack(pady=(20, 5))
+        Label(win, text=f"{len(self.view)} student(s) in the current view", font=("Segoe UI", 9), bg=COLORS['card_bg'], fg=COLORS['text_sub']).pack(pady=(0, 10))
+
+        fmt_var = StringVar(value='CSV')
+        comp_var = StringVar(value='None')
+        def mk_group(title, var, options):
+            Label(win, text=title, font=("Segoe UI", 9, "bold"), bg=COLORS['card_bg'], fg=COLORS['accent']).pack(anchor="w", padx=40, pady=(8, 2))
+            for opt in options:
+                Radiobutton(win, text=opt, value=opt, variable=var, font=("Segoe UI", 10), bg=COLORS['card_bg'], fg=COLORS['text_light'],
+                            selectcolor=COLORS['input_bg'], activebackground=COLORS['card_bg'], activeforeground="white", anchor="w").pack(fill=X, padx=50)
+        mk_group("Format", fmt_var, EXPORT_FORMATS)
+        mk_group("Compression", comp_var, EXPORT_COMPRESSION)
+
+        bar = ttk.Progressbar(win, orient=HORIZONTAL, mode='determinate', maximum=100)
+        bar.pack(fill=X, padx=40, pady=(15, 5))
+        status = Label(win, text="", font=("Segoe UI", 9), bg=COLORS['card_bg'], fg=COLORS['text_sub'])
+        status.pack()
+
+        btn_frame = Frame(win, bg=COLORS['card_bg'])
+        btn_frame.pack(side=BOTTOM, fill=X, pady=20, padx=40)
+
+        def start():
+            fmt, comp = fmt_var.get(), comp_var.get()
+            ext = EXPORT_FORMATS[fmt] + EXPORT_COMPRESSION[comp]
+            path = filedialog.asksaveasfilename(parent=win, defaultextension=ext, initialfile="studentReport" + ext,
+                                                filetypes=[(fmt, "*" + ext), ("All files", "*.*")])
+            if not path: return
+            rows = list(self.view)   #Snapshot of references; the rows themselves are not copied
+            self.export_cancel = threading.Event()
+            btn_start.config(state='disabled')
+            status.config(text="Exporting...")
+
+            def run():
+                try:
+                    n = stream_export(rows, path, fmt, comp,
+                                      progress=lambda d, t: self.export_queue.put(('progress', d, t)),
+                                      cancel=self.export_cancel)
+                    self.export_queue.put(('done', n, path))
+                except ExportCancelled:
+                    self.export_queue.put(('cancelled',))
+                except Exception as e:
+                    self.export_queue.put(('error', str(e)))
+            threading.Thread(target=run, daemon=True).start()
+            self.root.after(100, poll)
+
+        def poll():
+            finished = False
+            try:
+                while True:
+                    msg = self.export_queue.get_nowait()
+                    if msg[0] == 'progress':
+                        d, t = msg[1], msg[2]
+                        if bar.winfo_exists():
+                            bar['value'] = (d / t * 100) if t else 100
+                            status.config(text=f"Exporting... {d * 100 // t if t else 100}%")
+                    else:
+                        finished = True
+                        self.export_cancel = None
+                        if msg[0] == 'done':
+                            messagebox.showinfo("Export", f"Exported {msg[1]} student(s) to\n{msg[2]}")
+                        elif msg[0] == 'error':
+                            messagebox.showerror("Export Error", msg[1])
+                        if win.winfo_exists(): win.destroy()
+            except queue.Empty:
+                pass
+            if not finished: self.root.after(100, poll)
+
+        def cancel():
+            if self.export_cancel is not None: self.export_cancel.set()
+            else: win.destroy()
+
+        Button(btn_frame, text="Cancel", command=cancel, font=("Segoe UI", 10), bg=COLORS['sidebar_bg'], fg="white", bd=0, padx=20, pady=10, cursor="hand2").pack(side=LEFT)
+        btn_start = Button(btn_frame, text="Export", command=start, font=("Segoe UI", 10, "bold"), bg=COLORS['accent'], fg="white", bd=0, padx=20, pady=10, cursor="hand2")
+        btn_start.pack(side=RIGHT)
+        win.protocol("WM_DELETE_WINDOW", cancel)
+
 if __name__ == "__main__":
     root = Tk()
     app = StudentManagerApp(root)